@@ -7,6 +7,7 @@
 
 import json
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 from extract_msg import parse_msg_file
@@ -23,7 +24,7 @@ def load_files_config(config_path: Path) -> dict:
         return json.load(f)
 
 
-def batch_extract(config_path: Path, extraction_base: Path, output_file: Path):
+def batch_extract(config_path: Path, extraction_base: Path, output_file: Path, jobs: int = 1):
     """
     批量提取所有 .msg 文件为 JSON，合并到一个文件
     
@@ -31,6 +32,7 @@ def batch_extract(config_path: Path, extraction_base: Path, output_file: Path):
         config_path: files.json 路径
         extraction_base: 日文原版文件的基础路径
         output_file: JSON 输出文件
+        jobs: 并行解析的进程数（1 表示在当前进程中逐个解析）
     """
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
@@ -41,6 +43,8 @@ def batch_extract(config_path: Path, extraction_base: Path, output_file: Path):
     extracted_count = 0
     failed_files = []
     
+    # 收集需要提取的文件
+    msg_files = []
     for file_key, file_path in config["files"].items():
         if not file_key.endswith(".msg"):
             continue
@@ -53,18 +57,29 @@ def batch_extract(config_path: Path, extraction_base: Path, output_file: Path):
             failed_files.append(file_key)
             continue
         
-        try:
-            print(f"正在提取: {file_key}")
-            json_data = parse_msg_file(jp_file_path)
-            
-            # 文件名（不含扩展名）作为 key
-            file_key_base = file_key.replace(".msg", "")
-            all_data[file_key_base] = json_data
-            
-            extracted_count += 1
-        except Exception as e:
-            print(f"错误: 提取 {file_key} 失败: {e}")
-            failed_files.append(file_key)
+        msg_files.append((file_key, jp_file_path))
+    
+    # 多进程时先提交全部解析任务，结果仍按原顺序合并
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(msg_files) > 1 else None
+    try:
+        futures = [executor.submit(parse_msg_file, path) for _, path in msg_files] if executor else None
+        
+        for n, (file_key, jp_file_path) in enumerate(msg_files):
+            try:
+                print(f"正在提取: {file_key}")
+                json_data = futures[n].result() if executor else parse_msg_file(jp_file_path)
+                
+                # 文件名（不含扩展名）作为 key
+                file_key_base = file_key.replace(".msg", "")
+                all_data[file_key_base] = json_data
+                
+                extracted_count += 1
+            except Exception as e:
+                print(f"错误: 提取 {file_key} 失败: {e}")
+                failed_files.append(file_key)
+    finally:
+        if executor:
+            executor.shutdown()
     
     # 保存到单个文件
     with open(output_file, 'w', encoding='utf-8') as f:
@@ -79,11 +94,20 @@ def batch_extract(config_path: Path, extraction_base: Path, output_file: Path):
 
 
 def main():
+    args = sys.argv[1:]
+    
+    # --jobs N：并行解析的进程数
+    jobs = 1
+    if "--jobs" in args:
+        pos = args.index("--jobs")
+        jobs = int(args[pos + 1])
+        del args[pos:pos + 2]
+    
     # 如果提供了参数，使用参数；否则使用默认路径
-    if len(sys.argv) >= 4:
-        config_path = Path(sys.argv[1])
-        extraction_base = Path(sys.argv[2])
-        output_file = Path(sys.argv[3])
+    if len(args) >= 3:
+        config_path = Path(args[0])
+        extraction_base = Path(args[1])
+        output_file = Path(args[2])
     else:
         config_path = DEFAULT_FILES_JSON
         extraction_base = DEFAULT_EXTRACTION_BASE
@@ -94,7 +118,7 @@ def main():
         print(f"  输出文件: {output_file}")
         print()
     
-    batch_extract(config_path, extraction_base, output_file)
+    batch_extract(config_path, extraction_base, output_file, jobs)
 
 
 if __name__ == "__main__":
@@ -59,20 +59,20 @@ def batch_extract_texts(json_file: Path, output_dir: Path):
                 msg_texts = texts[msg_name]
                 current_speaker = None
                 
-                for item in msg_texts:
-                    if item["id"].endswith("_speaker"):
+                for item_id, text in zip(msg_texts["ids"], msg_texts["texts"]):
+                    if item_id.endswith("_speaker"):
                         # 收集 speaker
-                        speaker_text = item["text"]
+                        speaker_text = text
                         if speaker_text not in all_speakers:
                             all_speakers[speaker_text] = ""
                         current_speaker = speaker_text
-                    elif item["id"].startswith(msg_name + "_dialogue_"):
+                    elif item_id.startswith(msg_name + "_dialogue_"):
                         # 收集 dialogue，不记录文件信息（因为已经在键中）
                         file_texts.append({
                             "msg": msg_name,
                             "speaker": current_speaker,
-                            "id": item["id"],
-                            "text": item["text"]
+                            "id": item_id,
+                            "text": text
                         })
             
             # 以文件名作为键
@@ -10,7 +10,7 @@ import shutil
 import sys
 from pathlib import Path
 
-from extract_msg import rebuild_msg_file
+from extract_msg import write_msg_file
 
 # 默认路径配置
 DEFAULT_JSON_FILE = Path("json/all.json")
@@ -87,11 +87,9 @@ def batch_rebuild(json_file: Path, output_base_dir: Path, config_path: Path = No
             # 获取该文件的翻译文本（如果存在）
             translated_texts = translated_texts_dict.get(file_key)
             
-            # 重建 .msg 文件
-            msg_content = rebuild_msg_file(json_data, translated_texts)
-            
+            # 重建 .msg 文件（逐行写入，不在内存中拼接整个文件）
             with open(msg_path, 'w', encoding='utf-8') as f:
-                f.write(msg_content)
+                write_msg_file(json_data, f, translated_texts)
             
             print(f"已重组: {file_key} -> {msg_path}")
             rebuilt_count += 1
@@ -13,12 +13,19 @@ import copy
 import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 默认路径配置
 DEFAULT_TEXTS_FILE = Path("texts/texts.json")
 DEFAULT_API_KEY_FILE = Path("api_key.txt")
 DEFAULT_PROGRESS_FILE = Path("texts/translate_progress.json")
+WRITE_BUFFER_SIZE = 1 << 20  # JSON 写入缓冲区大小（1MB）
+PROGRESS_LOG_BUFFER_SIZE = 1 << 16  # 进度日志写入缓冲区大小（64KB）
 
 # API 配置
 API_BASE_URL = "https://api.vveai.com/v1/chat/completions"
@@ -41,26 +48,151 @@ def load_api_key(api_key_file: Path) -> Optional[str]:
     return None
 
 
+def load_json_file(path: Path) -> Any:
+    """一次性读取 JSON 文件字节并解析（优先使用 orjson）"""
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def save_json_file(path: Path, data: Any):
+    """在内存中序列化 JSON 后以大缓冲区一次写入（优先使用 orjson，格式与 indent=2 的 json.dump 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(content)
+
+
+# 每个工作线程各自持有一个 HTTP 会话，复用已建立的连接
+http_local = threading.local()
+
+
+def get_http_session():
+    """获取当前线程的 HTTP 会话（保持长连接，避免每次请求都重新建立 TCP/TLS 连接）"""
+    session = getattr(http_local, "session", None)
+    if session is None:
+        import requests
+        session = requests.Session()
+        http_local.session = session
+    return session
+
+
+def submit_bounded(executor: ThreadPoolExecutor, fn, items, max_pending: int):
+    """
+    有界提交任务，按完成顺序产出 (item, future)
+    同一时刻最多存在 max_pending 个未完成的 future，避免一次性为全部任务创建 future
+    """
+    pending = {}
+    for item in items:
+        if len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+        pending[executor.submit(fn, item)] = item
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+
+
 def load_progress(progress_file: Path) -> Dict[str, Any]:
     """加载进度记录文件"""
     if progress_file.exists():
         try:
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json_file(progress_file)
         except (json.JSONDecodeError, IOError) as e:
             print(f"警告: 无法读取进度文件 {progress_file}: {e}")
             return {}
     return {}
 
 
-def save_progress(progress_file: Path, progress_data: Dict[str, Any]):
-    """保存进度记录文件"""
+def save_progress(progress_file: Path, progress_data: Dict[str, Any]) -> bool:
+    """保存进度记录文件，返回是否保存成功"""
     try:
         progress_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+        save_json_file(progress_file, progress_data)
+        return True
     except IOError as e:
         print(f"警告: 无法保存进度文件 {progress_file}: {e}")
+        return False
+
+
+def record_progress(progress_data: Dict[str, Any], file_key: str, item_id: str, idx: int, ok: bool) -> Tuple[int, int]:
+    """
+    在进度记录中登记一条翻译结果
+    成功时记入 completed 并从 failed 中移除，失败时记入 failed
+    
+    返回: (completed 数量变化, failed 数量变化)
+    """
+    completed_items = progress_data["completed"].setdefault(file_key, [])
+    failed_items = progress_data["failed"].setdefault(file_key, [])
+    completed_delta = 0
+    failed_delta = 0
+    
+    if ok:
+        # 记录成功（使用 id）
+        if item_id not in completed_items:
+            completed_items.append(item_id)
+            completed_delta += 1
+        # 如果之前失败过，从失败记录中移除（兼容旧格式：也检查 idx）
+        if item_id in failed_items:
+            failed_items.remove(item_id)
+            failed_delta -= 1
+        elif idx in failed_items:
+            failed_items.remove(idx)
+            failed_delta -= 1
+    else:
+        # 记录失败（使用 id），添加 id（如果不存在）
+        if item_id not in failed_items:
+            failed_items.append(item_id)
+            failed_delta += 1
+    
+    return completed_delta, failed_delta
+
+
+def get_progress_log_file(progress_file: Path) -> Path:
+    """进度日志文件路径（与进度文件同名，扩展名为 .jsonl）"""
+    return progress_file.with_suffix(".jsonl")
+
+
+def dump_progress_log_line(file_key: str, item_id: str, idx: int, ok: bool) -> bytes:
+    """将一条翻译结果序列化为进度日志中的一行"""
+    record = {"fk": file_key, "id": item_id, "idx": idx, "ok": ok}
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+def replay_progress_log(progress_file: Path, progress_data: Dict[str, Any]) -> int:
+    """
+    将进度日志中尚未合并到进度文件的记录重放到 progress_data
+    
+    返回: 重放的记录数
+    """
+    log_file = get_progress_log_file(progress_file)
+    if not log_file.exists():
+        return 0
+    
+    replayed_count = 0
+    with open(log_file, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line) if orjson is not None else json.loads(line)
+            except ValueError:
+                # 中断时可能留下不完整的最后一行
+                continue
+            record_progress(progress_data, record["fk"], record["id"], record["idx"], record["ok"])
+            replayed_count += 1
+    return replayed_count
+
+
+def compact_progress(progress_file: Path, progress_data: Dict[str, Any]):
+    """将完整进度写入进度文件，成功后删除已合并的进度日志"""
+    if save_progress(progress_file, progress_data):
+        get_progress_log_file(progress_file).unlink(missing_ok=True)
 
 
 def init_progress(texts_file: Path, output_file: Path) -> Dict[str, Any]:
@@ -83,10 +215,9 @@ def load_terms(terms_file: Path) -> Dict[str, str]:
     """从文件加载术语表"""
     if terms_file.exists():
         try:
-            with open(terms_file, 'r', encoding='utf-8') as f:
-                terms = json.load(f)
-                # 过滤掉空值
-                return {k: v for k, v in terms.items() if v and v.strip()}
+            terms = load_json_file(terms_file)
+            # 过滤掉空值
+            return {k: v for k, v in terms.items() if v and v.strip()}
         except (json.JSONDecodeError, IOError) as e:
             print(f"警告: 无法读取术语表文件 {terms_file}: {e}")
             return {}
@@ -99,15 +230,13 @@ def save_output_files(output_file: Path, texts_data: Dict[str, Any], texts_dict:
         # 确定保存的数据结构
         save_data = texts_data if ("texts" in texts_data or "speakers" in texts_data) else texts_dict
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
+        save_json_file(output_file, save_data)
         
         # 如果是直接结构且有speakers，也保存到单独的speakers_translated.json
         if speakers_dict and not ("texts" in texts_data or "speakers" in texts_data):
             speakers_output_file = output_file.parent / "speakers_translated.json"
             try:
-                with open(speakers_output_file, 'w', encoding='utf-8') as f:
-                    json.dump(speakers_dict, f, ensure_ascii=False, indent=2)
+                save_json_file(speakers_output_file, speakers_dict)
             except Exception:
                 pass  # 定期保存时静默失败
     
@@ -606,7 +735,7 @@ def translate_text(text: str, api_key: str, source_lang: str = "日语", target_
     
     for attempt in range(MAX_RETRIES):
         try:
-            response = requests.post(API_BASE_URL, headers=headers, json=data, timeout=30)
+            response = get_http_session().post(API_BASE_URL, headers=headers, json=data, timeout=30)
             response.raise_for_status()
             
             # 检查响应内容
@@ -697,8 +826,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     print(f"进度文件: {progress_file}")
     
     # 读取原文 texts.json
-    with open(texts_file, 'r', encoding='utf-8') as f:
-        original_texts_data = json.load(f)
+    original_texts_data = load_json_file(texts_file)
     
     # 深拷贝原文数据，用于比较和获取原文
     original_texts_data = copy.deepcopy(original_texts_data)
@@ -719,6 +847,11 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             print("创建新的进度记录文件")
         else:
             print(f"加载进度记录: 已完成 {progress_data.get('stats', {}).get('completed', 0)} 个，失败 {progress_data.get('stats', {}).get('failed', 0)} 个")
+        # 合并上次运行中只写入了进度日志的记录
+        replayed_count = replay_progress_log(progress_file, progress_data)
+        if replayed_count > 0:
+            print(f"从进度日志恢复了 {replayed_count} 条记录")
+            compact_progress(progress_file, progress_data)
     else:
         progress_data = init_progress(texts_file, output_file)
         print("不使用进度记录（从头开始）")
@@ -727,8 +860,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     # 这是我们要维护和更新的译文数据
     if output_file.exists():
         try:
-            with open(output_file, 'r', encoding='utf-8') as f:
-                translated_texts_data = json.load(f)
+            translated_texts_data = load_json_file(output_file)
             print(f"从输出文件加载已翻译的译文: {output_file}")
         except Exception as e:
             print(f"警告: 无法读取输出文件，将从头开始: {e}")
@@ -773,8 +905,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
         speakers_file = texts_file.parent / "speakers.json"
         if speakers_file.exists():
             try:
-                with open(speakers_file, 'r', encoding='utf-8') as f:
-                    speakers_dict = json.load(f)
+                speakers_dict = load_json_file(speakers_file)
                 print(f"从单独文件加载 speakers: {speakers_file}")
             except Exception as e:
                 print(f"警告: 无法读取 speakers.json: {e}")
@@ -783,8 +914,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     speakers_translated_file = texts_file.parent / "speakers_translated.json"
     if speakers_translated_file.exists() and speakers_dict:
         try:
-            with open(speakers_translated_file, 'r', encoding='utf-8') as f:
-                speakers_translated = json.load(f)
+            speakers_translated = load_json_file(speakers_translated_file)
             # 更新 speakers_dict，使用已翻译的值（只更新非空值）
             updated_count = 0
             for key, translated_value in speakers_translated.items():
@@ -841,6 +971,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     # 先翻译 speakers（如果有）
     speakers_completed_count = 0
     speakers_failed_count = 0
+    speakers_completed_total = 0  # 已有译文的 speaker 总数（随翻译结果递增，不再重复遍历 speakers_dict）
     
     if speakers_dict:
         # 创建 speaker_keys 列表用于索引映射（不存储到 progress）
@@ -857,6 +988,8 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             speakers_to_translate.append(idx)
         
+        speakers_completed_total = len(speaker_keys) - len(speakers_to_translate)
+        
         if speakers_to_translate:
             print(f"\n开始翻译 speakers...")
             print(f"需要翻译的 speakers: {len(speakers_to_translate)} 个")
@@ -872,7 +1005,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             def translate_speaker_task(speaker_idx):
                 """翻译单个 speaker 的任务函数"""
-                nonlocal speakers_completed_count_local, speakers_failed_count_local
+                nonlocal speakers_completed_count_local, speakers_failed_count_local, speakers_completed_total
                 
                 speaker_key = speaker_keys[speaker_idx]
                 
@@ -894,10 +1027,15 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                     if translated:
                         speakers_dict[speaker_key] = translated
                         speakers_completed_count_local += 1
-                        print(f"    [{speaker_idx+1}] 完成: {translated[:50]}...")
+                        speakers_completed_total += 1
                     else:
                         speakers_failed_count_local += 1
-                        print(f"    [{speaker_idx+1}] 翻译失败: {error_msg or '未知错误'}")
+                
+                # 在锁外输出日志
+                if translated:
+                    print(f"    [{speaker_idx+1}] 完成: {translated[:50]}...")
+                else:
+                    print(f"    [{speaker_idx+1}] 翻译失败: {error_msg or '未知错误'}")
                 
                 return True
             
@@ -912,22 +1050,20 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             try:
                 with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # 提交所有任务
-                    future_to_speaker = {executor.submit(translate_speaker_task, idx): idx for idx in speakers_to_translate}
+                    # 有界提交任务，同时最多存在 2 倍线程数的 future
+                    completed_futures = submit_bounded(executor, translate_speaker_task, speakers_to_translate, max_workers * 2)
                     
                     # 处理完成的任务
                     try:
                         completed_speakers_count = 0
-                        for future in as_completed(future_to_speaker):
-                            speaker_idx = future_to_speaker[future]
+                        for speaker_idx, future in completed_futures:
                             try:
                                 result = future.result()
                                 if result is False:
                                     # 调试模式达到限制，取消剩余任务
                                     if debug:
                                         print(f"调试模式: 已达到限制，取消剩余任务")
-                                        for f in future_to_speaker:
-                                            f.cancel()
+                                        executor.shutdown(wait=False, cancel_futures=True)
                                         break
                             except Exception as e:
                                 print(f"    [{speaker_idx+1}] 任务执行异常: {e}")
@@ -956,27 +1092,9 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                         print("\n\n收到中断信号 (CTRL+C)，正在优雅地关闭...")
                         print("正在取消未开始的 speaker 任务...")
                         
-                        # 取消所有未完成的任务
-                        cancelled_count = 0
-                        for future in future_to_speaker:
-                            if not future.done():
-                                future.cancel()
-                                cancelled_count += 1
-                        
-                        if cancelled_count > 0:
-                            print(f"已取消 {cancelled_count} 个未开始的 speaker 任务")
-                        
+                        # 取消所有未开始的任务（退出 with 时等待正在执行的任务完成）
+                        executor.shutdown(wait=False, cancel_futures=True)
                         print("等待正在执行的 speaker 任务完成...")
-                        # 等待正在执行的任务完成（最多等待5秒）
-                        start_time = time.time()
-                        for future in list(future_to_speaker.keys()):
-                            if not future.done() and not future.cancelled():
-                                try:
-                                    future.result(timeout=1)
-                                except:
-                                    pass
-                                if time.time() - start_time > 5:
-                                    break
                         
                         print("正在保存当前 speaker 翻译进度...")
             except KeyboardInterrupt:
@@ -999,9 +1117,6 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             save_output_files(output_file, save_data, texts_dict, speakers_dict)
             
-            # 计算统计信息
-            speakers_completed_total = sum(1 for v in speakers_dict.values() if v and v.strip())
-            
             # 保存进度文件
             with speakers_progress_lock:
                 save_progress(progress_file, progress_data)
@@ -1115,9 +1230,21 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     file_lock = threading.Lock()
     progress_lock = threading.Lock()
     
+    # 进度统计计数（随记录增减维护，保存前写回 progress_data["stats"]）
+    stats_completed = sum(len(indices) for indices in progress_data["completed"].values())
+    stats_failed = sum(len(indices) for indices in progress_data["failed"].values())
+    
+    def sync_progress_stats():
+        """将统计计数写回 progress_data（调用方需持有 progress_lock）"""
+        progress_data["stats"]["completed"] = stats_completed
+        progress_data["stats"]["failed"] = stats_failed
+    
+    # 待追加到进度日志的记录行（在 progress_lock 内追加，定期保存时取出写盘）
+    pending_log_lines = []
+    
     def translate_task(task_info):
         """翻译单个任务的函数"""
-        nonlocal translated_count_local, completed_count, failed_count_local
+        nonlocal translated_count_local, completed_count, failed_count_local, stats_completed, stats_failed
         
         file_key = task_info["file_key"]
         idx = task_info["idx"]
@@ -1181,141 +1308,120 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                     # 迁移旧格式：将 idx 转换为 id（如果可能）
                     # 这里我们保持兼容，新记录使用 id
                 
-                if file_key not in progress_data["completed"]:
-                    progress_data["completed"][file_key] = []
-                if file_key not in progress_data["failed"]:
-                    progress_data["failed"][file_key] = []
-                
                 if translated:
                     item["text"] = translated
                     translated_count_local += 1
-                    # 记录成功（使用 id）
-                    if item_id not in progress_data["completed"][file_key]:
-                        progress_data["completed"][file_key].append(item_id)
-                    # 如果之前失败过，从失败记录中移除（兼容旧格式）
-                    if file_key in progress_data["failed"]:
-                        if item_id in progress_data["failed"][file_key]:
-                            progress_data["failed"][file_key].remove(item_id)
-                        # 兼容旧格式：也检查 idx
-                        elif idx in progress_data["failed"][file_key]:
-                            progress_data["failed"][file_key].remove(idx)
-                    print(f"    [{file_key}][{idx+1}] 完成: {translated[:50]}...")
                 else:
-                    # 记录失败（使用 id）
                     failed_count_local += 1
-                    # 添加 id（如果不存在）
-                    if item_id not in progress_data["failed"][file_key]:
-                        progress_data["failed"][file_key].append(item_id)
-                    print(f"    [{file_key}][{idx+1}] 翻译失败: {error_msg or '未知错误'}")
-            
-            # 更新统计信息
-            progress_data["stats"]["completed"] = sum(len(indices) for indices in progress_data["completed"].values())
-            progress_data["stats"]["failed"] = sum(len(indices) for indices in progress_data["failed"].values())
+                
+                completed_delta, failed_delta = record_progress(progress_data, file_key, item_id, idx, bool(translated))
+                stats_completed += completed_delta
+                stats_failed += failed_delta
+                # 暂存进度日志行，随下一次定期保存追加写入
+                pending_log_lines.append(dump_progress_log_line(file_key, item_id, idx, bool(translated)))
+        
+        # 在锁外输出日志
+        if translated:
+            print(f"    [{file_key}][{idx+1}] 完成: {translated[:50]}...")
+        else:
+            print(f"    [{file_key}][{idx+1}] 翻译失败: {error_msg or '未知错误'}")
         
         return True
     
     # 使用线程池并发翻译
     save_interval = max(1, len(tasks) // 20)  # 每完成约5%的任务保存一次
     
+    # 以当前完整进度为基准开始新的进度日志，之后每次保存只追加新增的记录
+    compact_progress(progress_file, progress_data)
+    progress_log = open(get_progress_log_file(progress_file), 'ab', buffering=PROGRESS_LOG_BUFFER_SIZE)
+    
     interrupted = False
+    last_saved_count = None  # 本轮上次保存时的完成数（None 表示尚未保存），用于跳过无变化的保存
     try:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {executor.submit(translate_task, task): task for task in tasks}
+            # 有界提交任务，同时最多存在 2 倍线程数的 future
+            completed_futures = submit_bounded(executor, translate_task, tasks, max_workers * 2)
             
             # 处理完成的任务
             try:
-                for future in as_completed(future_to_task):
-                    task = future_to_task[future]
+                for task, future in completed_futures:
                     try:
                         result = future.result()
                         if result is False:
                             # 调试模式达到限制，取消剩余任务
                             if debug:
                                 print(f"调试模式: 已达到限制，取消剩余任务")
-                                for f in future_to_task:
-                                    f.cancel()
+                                executor.shutdown(wait=False, cancel_futures=True)
                                 break
                     except Exception as e:
                         print(f"    [{task['file_key']}][{task['idx']+1}] 任务执行异常: {e}")
                     
-                    # 定期保存进度
+                    # 定期保存进度（只在锁内读取计数，序列化在锁外进行）
                     with translated_count_lock:
-                        if completed_count % save_interval == 0 or completed_count == len(tasks):
-                            # 构建要保存的译文数据
-                            if "texts" in original_texts_data or "speakers" in original_texts_data:
-                                # 嵌套结构
-                                save_data = {
-                                    "texts": texts_dict,
-                                    "speakers": speakers_dict
-                                }
-                            else:
-                                # 直接结构
-                                save_data = texts_dict
-                            
-                            save_output_files(output_file, save_data, texts_dict, speakers_dict, file_lock)
-                            
-                            # 保存进度文件
-                            with progress_lock:
-                                save_progress(progress_file, progress_data)
+                        current_count = completed_count
+                    if (current_count % save_interval == 0 or current_count == len(tasks)) and current_count != last_saved_count:
+                        last_saved_count = current_count
+                        # 先取出待写的进度日志行，保证日志中的记录在随后保存的译文中都已存在
+                        with progress_lock:
+                            log_lines = pending_log_lines
+                            pending_log_lines = []
+                        
+                        # 构建要保存的译文数据
+                        if "texts" in original_texts_data or "speakers" in original_texts_data:
+                            # 嵌套结构
+                            save_data = {
+                                "texts": texts_dict,
+                                "speakers": speakers_dict
+                            }
+                        else:
+                            # 直接结构
+                            save_data = texts_dict
+                        
+                        save_output_files(output_file, save_data, texts_dict, speakers_dict, file_lock)
+                        
+                        # 进度只追加新增的记录，不再重写整个进度文件
+                        progress_log.write(b"".join(log_lines))
+                        progress_log.flush()
             except KeyboardInterrupt:
                 interrupted = True
                 print("\n\n收到中断信号 (CTRL+C)，正在优雅地关闭...")
                 print("正在取消未开始的任务...")
                 
-                # 取消所有未完成的任务
-                cancelled_count = 0
-                for future in future_to_task:
-                    if not future.done():
-                        future.cancel()
-                        cancelled_count += 1
-                
-                if cancelled_count > 0:
-                    print(f"已取消 {cancelled_count} 个未开始的任务")
-                
+                # 取消所有未开始的任务（退出 with 时等待正在执行的任务完成）
+                executor.shutdown(wait=False, cancel_futures=True)
                 print("等待正在执行的任务完成...")
-                # 等待正在执行的任务完成（最多等待5秒）
-                start_time = time.time()
-                for future in list(future_to_task.keys()):
-                    if not future.done() and not future.cancelled():
-                        try:
-                            future.result(timeout=1)
-                        except:
-                            pass
-                        if time.time() - start_time > 5:
-                            break
                 
                 print("正在保存当前进度...")
     except KeyboardInterrupt:
         interrupted = True
         print("\n\n收到中断信号 (CTRL+C)，正在保存进度...")
     
-    # 最终保存译文数据
-    if "texts" in original_texts_data or "speakers" in original_texts_data:
-        # 嵌套结构
-        save_data = {
-            "texts": texts_dict,
-            "speakers": speakers_dict
-        }
-    else:
-        # 直接结构
-        save_data = texts_dict
-    
-    save_output_files(output_file, save_data, texts_dict, speakers_dict)
+    # 最终保存译文数据（自上次定期保存后没有新完成的任务时跳过）
+    if completed_count != last_saved_count:
+        if "texts" in original_texts_data or "speakers" in original_texts_data:
+            # 嵌套结构
+            save_data = {
+                "texts": texts_dict,
+                "speakers": speakers_dict
+            }
+        else:
+            # 直接结构
+            save_data = texts_dict
+        
+        save_output_files(output_file, save_data, texts_dict, speakers_dict)
     
-    # 最终保存进度文件
+    # 最终保存进度文件（写入完整进度并合并进度日志）
     try:
+        progress_log.close()
         with progress_lock:
+            sync_progress_stats()
             progress_data["stats"]["total"] = total_texts
             if speakers_dict:
                 progress_data["stats"]["speakers_total"] = len(speakers_dict)
-            save_progress(progress_file, progress_data)
+            compact_progress(progress_file, progress_data)
     except Exception as e:
         print(f"警告: 保存进度文件失败: {e}")
     
-    # 计算统计信息
-    speakers_completed_total = sum(1 for v in speakers_dict.values() if v and v.strip()) if speakers_dict else 0
-    
     # 打印统计信息
     status = "已中断，进度已保存" if interrupted else "完成"
     print(f"\n翻译{status}!")
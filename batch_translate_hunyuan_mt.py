@@ -13,12 +13,19 @@ import copy
 import threading
 from pathlib import Path
 from typing import Dict, List, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # 默认路径配置
 DEFAULT_TEXTS_FILE = Path("texts/texts.json")
 DEFAULT_API_KEY_FILE = Path("api_key.txt")
 DEFAULT_PROGRESS_FILE = Path("texts/translate_progress.json")
+WRITE_BUFFER_SIZE = 1 << 20  # JSON 写入缓冲区大小（1MB）
+PROGRESS_LOG_BUFFER_SIZE = 1 << 16  # 进度日志写入缓冲区大小（64KB）
 
 # API 配置
 API_BASE_URL = "http://127.0.0.1:8080/v1/chat/completions"
@@ -37,26 +44,148 @@ def load_api_key(api_key_file: Path) -> Optional[str]:
     return None
 
 
+def load_json_file(path: Path) -> Any:
+    """一次性读取 JSON 文件字节并解析（优先使用 orjson）"""
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def save_json_file(path: Path, data: Any):
+    """在内存中序列化 JSON 后以大缓冲区一次写入（优先使用 orjson，格式与 indent=2 的 json.dump 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(content)
+
+
+# 每个工作线程各自持有一个 HTTP 会话，复用已建立的连接
+http_local = threading.local()
+
+
+def get_http_session():
+    """获取当前线程的 HTTP 会话（保持长连接，避免每次请求都重新建立 TCP/TLS 连接）"""
+    session = getattr(http_local, "session", None)
+    if session is None:
+        import requests
+        session = requests.Session()
+        http_local.session = session
+    return session
+
+
+def submit_bounded(executor: ThreadPoolExecutor, fn, items, max_pending: int):
+    """
+    有界提交任务，按完成顺序产出 (item, future)
+    同一时刻最多存在 max_pending 个未完成的 future，避免一次性为全部任务创建 future
+    """
+    pending = {}
+    for item in items:
+        if len(pending) >= max_pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), future
+        pending[executor.submit(fn, item)] = item
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            yield pending.pop(future), future
+
+
 def load_progress(progress_file: Path) -> Dict[str, Any]:
     """加载进度记录文件"""
     if progress_file.exists():
         try:
-            with open(progress_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json_file(progress_file)
         except (json.JSONDecodeError, IOError) as e:
             print(f"警告: 无法读取进度文件 {progress_file}: {e}")
             return {}
     return {}
 
 
-def save_progress(progress_file: Path, progress_data: Dict[str, Any]):
-    """保存进度记录文件"""
+def save_progress(progress_file: Path, progress_data: Dict[str, Any]) -> bool:
+    """保存进度记录文件，返回是否保存成功"""
     try:
         progress_file.parent.mkdir(parents=True, exist_ok=True)
-        with open(progress_file, 'w', encoding='utf-8') as f:
-            json.dump(progress_data, f, ensure_ascii=False, indent=2)
+        save_json_file(progress_file, progress_data)
+        return True
     except IOError as e:
         print(f"警告: 无法保存进度文件 {progress_file}: {e}")
+        return False
+
+
+def record_progress(progress_data: Dict[str, Any], file_key: str, idx: int, ok: bool) -> Tuple[int, int]:
+    """
+    在进度记录中登记一条翻译结果
+    成功时记入 completed 并从 failed 中移除，失败时记入 failed
+    
+    返回: (completed 数量变化, failed 数量变化)
+    """
+    completed_items = progress_data["completed"].setdefault(file_key, [])
+    failed_items = progress_data["failed"].setdefault(file_key, [])
+    completed_delta = 0
+    failed_delta = 0
+    
+    if ok:
+        # 记录成功（只保存索引）
+        if idx not in completed_items:
+            completed_items.append(idx)
+            completed_delta += 1
+        # 如果之前失败过，从失败记录中移除
+        if idx in failed_items:
+            failed_items.remove(idx)
+            failed_delta -= 1
+    else:
+        # 记录失败（只保存索引），添加索引（如果不存在）
+        if idx not in failed_items:
+            failed_items.append(idx)
+            failed_delta += 1
+    
+    return completed_delta, failed_delta
+
+
+def get_progress_log_file(progress_file: Path) -> Path:
+    """进度日志文件路径（与进度文件同名，扩展名为 .jsonl）"""
+    return progress_file.with_suffix(".jsonl")
+
+
+def dump_progress_log_line(file_key: str, idx: int, ok: bool) -> bytes:
+    """将一条翻译结果序列化为进度日志中的一行"""
+    record = {"fk": file_key, "idx": idx, "ok": ok}
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record, ensure_ascii=False).encode('utf-8') + b"\n"
+
+
+def replay_progress_log(progress_file: Path, progress_data: Dict[str, Any]) -> int:
+    """
+    将进度日志中尚未合并到进度文件的记录重放到 progress_data
+    
+    返回: 重放的记录数
+    """
+    log_file = get_progress_log_file(progress_file)
+    if not log_file.exists():
+        return 0
+    
+    replayed_count = 0
+    with open(log_file, 'rb') as f:
+        for line in f:
+            try:
+                record = orjson.loads(line) if orjson is not None else json.loads(line)
+            except ValueError:
+                # 中断时可能留下不完整的最后一行
+                continue
+            record_progress(progress_data, record["fk"], record["idx"], record["ok"])
+            replayed_count += 1
+    return replayed_count
+
+
+def compact_progress(progress_file: Path, progress_data: Dict[str, Any]):
+    """将完整进度写入进度文件，成功后删除已合并的进度日志"""
+    if save_progress(progress_file, progress_data):
+        get_progress_log_file(progress_file).unlink(missing_ok=True)
 
 
 def init_progress(texts_file: Path, output_file: Path) -> Dict[str, Any]:
@@ -75,6 +204,39 @@ def init_progress(texts_file: Path, output_file: Path) -> Dict[str, Any]:
     }
 
 
+def migrate_progress(progress_data: Dict[str, Any]) -> Dict[str, Dict[int, str]]:
+    """
+    一次性将进度记录升级为索引列表格式（1.1）
+    旧格式（1.0）的 completed/failed 为 {idx: translated_text} 字典，升级后统一为 [idx, ...]
+    
+    返回: 旧格式 completed 中保存的译文 {"file_key": {idx: "translated_text"}}，用于恢复
+    """
+    legacy_translations = {}
+    for key in ("completed", "failed"):
+        records = progress_data.setdefault(key, {})
+        for file_key, items in records.items():
+            if isinstance(items, dict):
+                indices = []
+                for idx_str, translated_text in items.items():
+                    if idx_str.isdigit():
+                        indices.append(int(idx_str))
+                        if key == "completed":
+                            legacy_translations.setdefault(file_key, {})[int(idx_str)] = translated_text
+                records[file_key] = indices
+            else:
+                records[file_key] = [idx for idx in items if isinstance(idx, int)]
+    progress_data.setdefault("stats", {"total": 0, "completed": 0, "failed": 0})
+    progress_data["version"] = "1.1"
+    return legacy_translations
+
+
+def check_progress_format(progress_data: Dict[str, Any]):
+    """检查迁移后的进度记录满足 {"file_key": [idx, ...]} 格式，之后的代码不再做类型分支"""
+    for key in ("completed", "failed"):
+        for file_key, indices in progress_data[key].items():
+            assert isinstance(indices, list) and all(isinstance(idx, int) for idx in indices), f"进度记录格式错误: {key}[{file_key}]"
+
+
 def get_task_key(file_key: str, idx: int) -> str:
     """生成任务唯一标识"""
     return f"{file_key}:{idx}"
@@ -90,8 +252,7 @@ def load_translated_from_output(output_file: Path, original_texts_dict: Dict[str
         return {}
     
     try:
-        with open(output_file, 'r', encoding='utf-8') as f:
-            output_data = json.load(f)
+        output_data = load_json_file(output_file)
         
         # 处理嵌套结构
         if "texts" in output_data:
@@ -188,7 +349,7 @@ def translate_text(text: str, api_key: str, source_lang: str = "日语", target_
         }
         
         try:
-            response = requests.post(API_BASE_URL, headers=headers, json=data, timeout=30)
+            response = get_http_session().post(API_BASE_URL, headers=headers, json=data, timeout=30)
             response.raise_for_status()
             
             # 检查响应内容
@@ -291,8 +452,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     print(f"进度文件: {progress_file}")
     
     # 读取 texts.json
-    with open(texts_file, 'r', encoding='utf-8') as f:
-        texts_data = json.load(f)
+    texts_data = load_json_file(texts_file)
     
     # 深拷贝数据，避免修改原数据
     texts_data = copy.deepcopy(texts_data)
@@ -309,6 +469,17 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
         progress_data = init_progress(texts_file, output_file)
         print("不使用进度记录（从头开始）")
     
+    # 旧格式进度记录在此一次性升级，后续只处理索引列表
+    legacy_translations = migrate_progress(progress_data)
+    check_progress_format(progress_data)
+    
+    # 合并上次运行中只写入了进度日志的记录
+    if resume or retry_failed:
+        replayed_count = replay_progress_log(progress_file, progress_data)
+        if replayed_count > 0:
+            print(f"从进度日志恢复了 {replayed_count} 条记录")
+            compact_progress(progress_file, progress_data)
+    
     # texts.json 结构: {"E0000": [...], "E0001": [...], ...}
     # 如果包含 "speakers" 和 "texts" 键，则使用嵌套结构
     if "texts" in texts_data and "speakers" in texts_data:
@@ -324,16 +495,14 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
         speakers_file = texts_file.parent / "speakers.json"
         if speakers_file.exists():
             try:
-                with open(speakers_file, 'r', encoding='utf-8') as f:
-                    speakers_dict = json.load(f)
+                speakers_dict = load_json_file(speakers_file)
                 print(f"从单独文件加载 speakers: {speakers_file}")
             except Exception as e:
                 print(f"警告: 无法读取 speakers.json: {e}")
     
     # 从输出文件和进度文件恢复已翻译的文本
-    completed_dict = progress_data.get("completed", {})
-    failed_dict = progress_data.get("failed", {})
-    progress_version = progress_data.get("version", "1.0")
+    completed_dict = progress_data["completed"]
+    failed_dict = progress_data["failed"]
     restored_count = 0
     
     # 保存原始 texts_dict 用于比较
@@ -348,41 +517,22 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             if file_key not in texts_dict:
                 continue
             
-            completed_items = completed_dict[file_key]
+            legacy_items = legacy_translations.get(file_key, {})
             
-            # 处理新格式（索引列表）和旧格式（字典）
-            if isinstance(completed_items, list):
-                # 新格式：索引列表
-                for idx in completed_items:
-                    if isinstance(idx, int) and 0 <= idx < len(texts_dict[file_key]):
-                        # 检查原始文本是否为空，如果为空则跳过
-                        original_text = original_texts_dict[file_key][idx].get("text", "").strip()
-                        if not original_text:
-                            continue
-                        
-                        # 优先从输出文件恢复
-                        if file_key in translated_from_output and idx in translated_from_output[file_key]:
-                            texts_dict[file_key][idx]["text"] = translated_from_output[file_key][idx]
-                            restored_count += 1
-            else:
-                # 旧格式：字典 {idx: translated_text}
-                for idx_str, translated_text in completed_items.items():
-                    try:
-                        idx = int(idx_str)
-                        if 0 <= idx < len(texts_dict[file_key]):
-                            # 检查原始文本是否为空，如果为空则跳过
-                            original_text = original_texts_dict[file_key][idx].get("text", "").strip()
-                            if not original_text:
-                                continue
-                            
-                            # 优先从输出文件恢复，否则使用进度文件中的内容
-                            if file_key in translated_from_output and idx in translated_from_output[file_key]:
-                                texts_dict[file_key][idx]["text"] = translated_from_output[file_key][idx]
-                            else:
-                                texts_dict[file_key][idx]["text"] = translated_text
-                            restored_count += 1
-                    except (ValueError, IndexError):
-                        pass
+            for idx in completed_dict[file_key]:
+                if 0 <= idx < len(texts_dict[file_key]):
+                    # 检查原始文本是否为空，如果为空则跳过
+                    original_text = original_texts_dict[file_key][idx].get("text", "").strip()
+                    if not original_text:
+                        continue
+                    
+                    # 优先从输出文件恢复，否则使用旧格式进度文件中的译文
+                    if file_key in translated_from_output and idx in translated_from_output[file_key]:
+                        texts_dict[file_key][idx]["text"] = translated_from_output[file_key][idx]
+                        restored_count += 1
+                    elif idx in legacy_items:
+                        texts_dict[file_key][idx]["text"] = legacy_items[idx]
+                        restored_count += 1
         
         # 恢复输出文件中有但进度文件中没有的（可能进度文件丢失）
         for file_key, translated_items in translated_from_output.items():
@@ -396,12 +546,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                         continue
                 
                 # 检查是否已在进度文件中
-                is_in_progress = False
-                if file_key in completed_dict:
-                    if isinstance(completed_dict[file_key], list):
-                        is_in_progress = idx in completed_dict[file_key]
-                    else:
-                        is_in_progress = str(idx) in completed_dict[file_key]
+                is_in_progress = file_key in completed_dict and idx in completed_dict[file_key]
                 
                 if not is_in_progress and 0 <= idx < len(texts_dict[file_key]):
                     texts_dict[file_key][idx]["text"] = translated_text
@@ -442,6 +587,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     # 先翻译 speakers（如果有）
     speakers_completed_count = 0
     speakers_failed_count = 0
+    speakers_completed_total = 0  # 已有译文的 speaker 总数（随翻译结果递增，不再重复遍历 speakers_dict）
     
     if speakers_dict:
         # 创建 speaker_keys 列表用于索引映射（不存储到 progress）
@@ -452,8 +598,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             # 尝试从输出文件恢复（嵌套结构）
             if output_file.exists():
                 try:
-                    with open(output_file, 'r', encoding='utf-8') as f:
-                        output_data = json.load(f)
+                    output_data = load_json_file(output_file)
                     if "speakers" in output_data:
                         output_speakers = output_data["speakers"]
                         for speaker_key in speaker_keys:
@@ -468,8 +613,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             speakers_translated_file = texts_file.parent / "speakers_translated.json"
             if speakers_translated_file.exists():
                 try:
-                    with open(speakers_translated_file, 'r', encoding='utf-8') as f:
-                        output_speakers = json.load(f)
+                    output_speakers = load_json_file(speakers_translated_file)
                     for speaker_key in speaker_keys:
                         if speaker_key in output_speakers:
                             translated_value = output_speakers[speaker_key]
@@ -489,6 +633,8 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             speakers_to_translate.append(idx)
         
+        speakers_completed_total = len(speaker_keys) - len(speakers_to_translate)
+        
         if speakers_to_translate:
             print(f"\n开始翻译 speakers...")
             print(f"需要翻译的 speakers: {len(speakers_to_translate)} 个")
@@ -504,7 +650,7 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             def translate_speaker_task(speaker_idx):
                 """翻译单个 speaker 的任务函数"""
-                nonlocal speakers_completed_count_local, speakers_failed_count_local
+                nonlocal speakers_completed_count_local, speakers_failed_count_local, speakers_completed_total
                 
                 speaker_key = speaker_keys[speaker_idx]
                 
@@ -516,10 +662,15 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                     if translated:
                         speakers_dict[speaker_key] = translated
                         speakers_completed_count_local += 1
-                        print(f"    [{speaker_idx+1}] 完成: {translated[:50]}...")
+                        speakers_completed_total += 1
                     else:
                         speakers_failed_count_local += 1
-                        print(f"    [{speaker_idx+1}] 翻译失败: {error_msg or '未知错误'}")
+                
+                # 在锁外输出日志
+                if translated:
+                    print(f"    [{speaker_idx+1}] 完成: {translated[:50]}...")
+                else:
+                    print(f"    [{speaker_idx+1}] 翻译失败: {error_msg or '未知错误'}")
                 
                 return True
             
@@ -534,22 +685,20 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             try:
                 with ThreadPoolExecutor(max_workers=max_workers) as executor:
-                    # 提交所有任务
-                    future_to_speaker = {executor.submit(translate_speaker_task, idx): idx for idx in speakers_to_translate}
+                    # 有界提交任务，同时最多存在 2 倍线程数的 future
+                    completed_futures = submit_bounded(executor, translate_speaker_task, speakers_to_translate, max_workers * 2)
                     
                     # 处理完成的任务
                     try:
                         completed_speakers_count = 0
-                        for future in as_completed(future_to_speaker):
-                            speaker_idx = future_to_speaker[future]
+                        for speaker_idx, future in completed_futures:
                             try:
                                 result = future.result()
                                 if result is False:
                                     # 调试模式达到限制，取消剩余任务
                                     if debug:
                                         print(f"调试模式: 已达到限制，取消剩余任务")
-                                        for f in future_to_speaker:
-                                            f.cancel()
+                                        executor.shutdown(wait=False, cancel_futures=True)
                                         break
                             except Exception as e:
                                 print(f"    [{speaker_idx+1}] 任务执行异常: {e}")
@@ -566,15 +715,13 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                                     save_data = texts_dict
                                 
                                 with speakers_file_lock:
-                                    with open(output_file, 'w', encoding='utf-8') as f:
-                                        json.dump(save_data, f, ensure_ascii=False, indent=2)
+                                    save_json_file(output_file, save_data)
                                     
                                     # 如果是直接结构且有speakers，也保存到单独的speakers_translated.json（不覆盖原文件）
                                     if speakers_dict and not ("texts" in texts_data or "speakers" in texts_data):
                                         speakers_output_file = output_file.parent / "speakers_translated.json"
                                         try:
-                                            with open(speakers_output_file, 'w', encoding='utf-8') as f:
-                                                json.dump(speakers_dict, f, ensure_ascii=False, indent=2)
+                                            save_json_file(speakers_output_file, speakers_dict)
                                         except Exception as e:
                                             pass  # 定期保存时静默失败，避免输出太多
                                 
@@ -586,27 +733,9 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                         print("\n\n收到中断信号 (CTRL+C)，正在优雅地关闭...")
                         print("正在取消未开始的 speaker 任务...")
                         
-                        # 取消所有未完成的任务
-                        cancelled_count = 0
-                        for future in future_to_speaker:
-                            if not future.done():
-                                future.cancel()
-                                cancelled_count += 1
-                        
-                        if cancelled_count > 0:
-                            print(f"已取消 {cancelled_count} 个未开始的 speaker 任务")
-                        
+                        # 取消所有未开始的任务（退出 with 时等待正在执行的任务完成）
+                        executor.shutdown(wait=False, cancel_futures=True)
                         print("等待正在执行的 speaker 任务完成...")
-                        # 等待正在执行的任务完成（最多等待5秒）
-                        start_time = time.time()
-                        for future in list(future_to_speaker.keys()):
-                            if not future.done() and not future.cancelled():
-                                try:
-                                    future.result(timeout=1)
-                                except:
-                                    pass
-                                if time.time() - start_time > 5:
-                                    break
                         
                         print("正在保存当前 speaker 翻译进度...")
             except KeyboardInterrupt:
@@ -626,21 +755,16 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
                 if speakers_dict:
                     speakers_output_file = output_file.parent / "speakers_translated.json"
                     try:
-                        with open(speakers_output_file, 'w', encoding='utf-8') as f:
-                            json.dump(speakers_dict, f, ensure_ascii=False, indent=2)
+                        save_json_file(speakers_output_file, speakers_dict)
                         print(f"Speakers 已保存到: {speakers_output_file}")
                     except Exception as e:
                         print(f"警告: 保存 speakers_translated.json 失败: {e}")
             
             try:
-                with open(output_file, 'w', encoding='utf-8') as f:
-                    json.dump(save_data, f, ensure_ascii=False, indent=2)
+                save_json_file(output_file, save_data)
             except Exception as e:
                 print(f"警告: 保存输出文件失败: {e}")
             
-            # 计算统计信息（直接从 speakers_dict 计算）
-            speakers_completed_total = sum(1 for v in speakers_dict.values() if v and v.strip())
-            
             # 保存进度文件（不包含 speakers 信息）
             with speakers_progress_lock:
                 save_progress(progress_file, progress_data)
@@ -680,27 +804,11 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             if not original_text:
                 continue
             
-            # 检查是否已完成（支持新旧格式）
-            is_completed = False
-            if file_key in completed_dict:
-                completed_items = completed_dict[file_key]
-                if isinstance(completed_items, list):
-                    # 新格式：索引列表
-                    is_completed = idx in completed_items
-                else:
-                    # 旧格式：字典
-                    is_completed = str(idx) in completed_items
+            # 检查是否已完成
+            is_completed = file_key in completed_dict and idx in completed_dict[file_key]
             
-            # 检查是否是失败的文本（支持新旧格式）
-            is_failed = False
-            if file_key in failed_dict:
-                failed_items = failed_dict[file_key]
-                if isinstance(failed_items, list):
-                    # 新格式：索引列表
-                    is_failed = idx in failed_items
-                else:
-                    # 旧格式：字典（兼容处理）
-                    is_failed = str(idx) in failed_items
+            # 检查是否是失败的文本
+            is_failed = file_key in failed_dict and idx in failed_dict[file_key]
             
             # 如果已完成且不是重试失败模式，跳过
             if is_completed and not retry_failed:
@@ -746,9 +854,21 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
     file_lock = threading.Lock()
     progress_lock = threading.Lock()
     
+    # 进度统计计数（随记录增减维护，保存前写回 progress_data["stats"]）
+    stats_completed = sum(len(indices) for indices in progress_data["completed"].values())
+    stats_failed = sum(len(indices) for indices in progress_data["failed"].values())
+    
+    def sync_progress_stats():
+        """将统计计数写回 progress_data（调用方需持有 progress_lock）"""
+        progress_data["stats"]["completed"] = stats_completed
+        progress_data["stats"]["failed"] = stats_failed
+    
+    # 待追加到进度日志的记录行（在 progress_lock 内追加，定期保存时取出写盘）
+    pending_log_lines = []
+    
     def translate_task(task_info):
         """翻译单个任务的函数"""
-        nonlocal translated_count_local, completed_count, failed_count_local
+        nonlocal translated_count_local, completed_count, failed_count_local, stats_completed, stats_failed
         
         file_key = task_info["file_key"]
         idx = task_info["idx"]
@@ -777,188 +897,137 @@ def batch_translate_texts(texts_file: Path, api_key_file: Path, output_file: Pat
             
             # 更新进度记录
             with progress_lock:
-                # 确保使用新格式（索引列表）
-                if progress_data.get("version", "1.0") < "1.1":
-                    progress_data["version"] = "1.1"
-                    # 升级旧格式
-                    old_completed = progress_data.get("completed", {})
-                    new_completed = {}
-                    for fk, items in old_completed.items():
-                        if isinstance(items, dict):
-                            new_completed[fk] = [int(k) for k in items.keys() if k.isdigit()]
-                        else:
-                            new_completed[fk] = items
-                    progress_data["completed"] = new_completed
-                
-                if file_key not in progress_data["completed"]:
-                    progress_data["completed"][file_key] = []
-                if file_key not in progress_data["failed"]:
-                    progress_data["failed"][file_key] = []
-                
-                idx_str = str(idx)
-                
                 if translated:
                     item["text"] = translated
                     translated_count_local += 1
-                    # 记录成功（只保存索引）
-                    if idx not in progress_data["completed"][file_key]:
-                        progress_data["completed"][file_key].append(idx)
-                    # 如果之前失败过，从失败记录中移除
-                    if file_key in progress_data["failed"]:
-                        failed_items = progress_data["failed"][file_key]
-                        if isinstance(failed_items, list):
-                            if idx in failed_items:
-                                failed_items.remove(idx)
-                        else:
-                            # 旧格式：字典（兼容处理）
-                            if idx_str in failed_items:
-                                del failed_items[idx_str]
-                    print(f"    [{file_key}][{idx+1}] 完成: {translated[:50]}...")
                 else:
-                    # 记录失败（只保存索引）
                     failed_count_local += 1
-                    if file_key not in progress_data["failed"]:
-                        progress_data["failed"][file_key] = []
-                    # 确保是新格式（索引列表）
-                    if not isinstance(progress_data["failed"][file_key], list):
-                        # 升级旧格式
-                        old_failed = progress_data["failed"][file_key]
-                        progress_data["failed"][file_key] = [int(k) for k in old_failed.keys() if k.isdigit()]
-                    # 添加索引（如果不存在）
-                    if idx not in progress_data["failed"][file_key]:
-                        progress_data["failed"][file_key].append(idx)
-                    print(f"    [{file_key}][{idx+1}] 翻译失败: {error_msg or '未知错误'}")
-            
-            # 更新统计信息
-            progress_data["stats"]["completed"] = sum(len(indices) if isinstance(indices, list) else (len(indices) if isinstance(indices, dict) else 0) for indices in progress_data["completed"].values())
-            progress_data["stats"]["failed"] = sum(len(indices) if isinstance(indices, list) else (len(indices) if isinstance(indices, dict) else 0) for indices in progress_data["failed"].values())
+                
+                completed_delta, failed_delta = record_progress(progress_data, file_key, idx, bool(translated))
+                stats_completed += completed_delta
+                stats_failed += failed_delta
+                # 暂存进度日志行，随下一次定期保存追加写入
+                pending_log_lines.append(dump_progress_log_line(file_key, idx, bool(translated)))
+        
+        # 在锁外输出日志
+        if translated:
+            print(f"    [{file_key}][{idx+1}] 完成: {translated[:50]}...")
+        else:
+            print(f"    [{file_key}][{idx+1}] 翻译失败: {error_msg or '未知错误'}")
         
         return True
     
     # 使用线程池并发翻译
     save_interval = max(1, len(tasks) // 20)  # 每完成约5%的任务保存一次
     
+    # 以当前完整进度为基准开始新的进度日志，之后每次保存只追加新增的记录
+    compact_progress(progress_file, progress_data)
+    progress_log = open(get_progress_log_file(progress_file), 'ab', buffering=PROGRESS_LOG_BUFFER_SIZE)
+    
     interrupted = False
+    last_saved_count = None  # 本轮上次保存时的完成数（None 表示尚未保存），用于跳过无变化的保存
     try:
         with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            # 提交所有任务
-            future_to_task = {executor.submit(translate_task, task): task for task in tasks}
+            # 有界提交任务，同时最多存在 2 倍线程数的 future
+            completed_futures = submit_bounded(executor, translate_task, tasks, max_workers * 2)
             
             # 处理完成的任务
             try:
-                for future in as_completed(future_to_task):
-                    task = future_to_task[future]
+                for task, future in completed_futures:
                     try:
                         result = future.result()
                         if result is False:
                             # 调试模式达到限制，取消剩余任务
                             if debug:
                                 print(f"调试模式: 已达到限制，取消剩余任务")
-                                for f in future_to_task:
-                                    f.cancel()
+                                executor.shutdown(wait=False, cancel_futures=True)
                                 break
                     except Exception as e:
                         print(f"    [{task['file_key']}][{task['idx']+1}] 任务执行异常: {e}")
                     
-                    # 定期保存进度
+                    # 定期保存进度（只在锁内读取计数，序列化在锁外进行）
                     with translated_count_lock:
-                        if completed_count % save_interval == 0 or completed_count == len(tasks):
-                            # 保存输出文件和进度文件
-                            if "texts" in texts_data or "speakers" in texts_data:
-                                texts_data["texts"] = texts_dict
-                                texts_data["speakers"] = speakers_dict
-                                save_data = texts_data
-                            else:
-                                save_data = texts_dict
-                            
-                            with file_lock:
-                                with open(output_file, 'w', encoding='utf-8') as f:
-                                    json.dump(save_data, f, ensure_ascii=False, indent=2)
-                                
-                                # 如果是直接结构且有speakers，也保存到单独的speakers_translated.json（不覆盖原文件）
-                                if speakers_dict and not ("texts" in texts_data or "speakers" in texts_data):
-                                    speakers_output_file = output_file.parent / "speakers_translated.json"
-                                    try:
-                                        with open(speakers_output_file, 'w', encoding='utf-8') as f:
-                                            json.dump(speakers_dict, f, ensure_ascii=False, indent=2)
-                                    except Exception as e:
-                                        pass  # 定期保存时静默失败，避免输出太多
+                        current_count = completed_count
+                    if (current_count % save_interval == 0 or current_count == len(tasks)) and current_count != last_saved_count:
+                        last_saved_count = current_count
+                        # 先取出待写的进度日志行，保证日志中的记录在随后保存的译文中都已存在
+                        with progress_lock:
+                            log_lines = pending_log_lines
+                            pending_log_lines = []
+                        
+                        # 保存输出文件和进度文件
+                        if "texts" in texts_data or "speakers" in texts_data:
+                            texts_data["texts"] = texts_dict
+                            texts_data["speakers"] = speakers_dict
+                            save_data = texts_data
+                        else:
+                            save_data = texts_dict
+                        
+                        with file_lock:
+                            save_json_file(output_file, save_data)
                             
-                            # 保存进度文件
-                            with progress_lock:
-                                save_progress(progress_file, progress_data)
+                            # 如果是直接结构且有speakers，也保存到单独的speakers_translated.json（不覆盖原文件）
+                            if speakers_dict and not ("texts" in texts_data or "speakers" in texts_data):
+                                speakers_output_file = output_file.parent / "speakers_translated.json"
+                                try:
+                                    save_json_file(speakers_output_file, speakers_dict)
+                                except Exception as e:
+                                    pass  # 定期保存时静默失败，避免输出太多
+                        
+                        # 进度只追加新增的记录，不再重写整个进度文件
+                        progress_log.write(b"".join(log_lines))
+                        progress_log.flush()
             except KeyboardInterrupt:
                 interrupted = True
                 print("\n\n收到中断信号 (CTRL+C)，正在优雅地关闭...")
                 print("正在取消未开始的任务...")
                 
-                # 取消所有未完成的任务
-                cancelled_count = 0
-                for future in future_to_task:
-                    if not future.done():
-                        future.cancel()
-                        cancelled_count += 1
-                
-                if cancelled_count > 0:
-                    print(f"已取消 {cancelled_count} 个未开始的任务")
-                
+                # 取消所有未开始的任务（退出 with 时等待正在执行的任务完成）
+                executor.shutdown(wait=False, cancel_futures=True)
                 print("等待正在执行的任务完成...")
-                # 等待正在执行的任务完成（最多等待5秒）
-                start_time = time.time()
-                for future in list(future_to_task.keys()):
-                    if not future.done() and not future.cancelled():
-                        try:
-                            future.result(timeout=1)
-                        except:
-                            pass
-                        if time.time() - start_time > 5:
-                            break
                 
                 print("正在保存当前进度...")
     except KeyboardInterrupt:
         interrupted = True
         print("\n\n收到中断信号 (CTRL+C)，正在保存进度...")
     
-    # 最终保存
-    if "texts" in texts_data or "speakers" in texts_data:
-        texts_data["texts"] = texts_dict
-        texts_data["speakers"] = speakers_dict
-        save_data = texts_data
-    else:
-        save_data = texts_dict
-        # 直接结构，speakers 保存到单独的 speakers_translated.json 文件（不覆盖原文件）
-        if speakers_dict:
-            speakers_output_file = output_file.parent / "speakers_translated.json"
-            try:
-                with open(speakers_output_file, 'w', encoding='utf-8') as f:
-                    json.dump(speakers_dict, f, ensure_ascii=False, indent=2)
-                print(f"Speakers 已保存到: {speakers_output_file}")
-            except Exception as e:
-                print(f"警告: 保存 speakers_translated.json 失败: {e}")
-    
-    try:
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(save_data, f, ensure_ascii=False, indent=2)
-    except Exception as e:
-        print(f"警告: 保存输出文件失败: {e}")
+    # 最终保存（自上次定期保存后没有新完成的任务时跳过）
+    if completed_count != last_saved_count:
+        if "texts" in texts_data or "speakers" in texts_data:
+            texts_data["texts"] = texts_dict
+            texts_data["speakers"] = speakers_dict
+            save_data = texts_data
+        else:
+            save_data = texts_dict
+            # 直接结构，speakers 保存到单独的 speakers_translated.json 文件（不覆盖原文件）
+            if speakers_dict:
+                speakers_output_file = output_file.parent / "speakers_translated.json"
+                try:
+                    save_json_file(speakers_output_file, speakers_dict)
+                    print(f"Speakers 已保存到: {speakers_output_file}")
+                except Exception as e:
+                    print(f"警告: 保存 speakers_translated.json 失败: {e}")
+        
+        try:
+            save_json_file(output_file, save_data)
+        except Exception as e:
+            print(f"警告: 保存输出文件失败: {e}")
     
-    # 最终保存进度文件
+    # 最终保存进度文件（写入完整进度并合并进度日志）
     try:
+        progress_log.close()
         with progress_lock:
+            sync_progress_stats()
             progress_data["stats"]["total"] = total_texts
             if speakers_dict:
                 progress_data["stats"]["speakers_total"] = len(speakers_dict)
-            save_progress(progress_file, progress_data)
+            compact_progress(progress_file, progress_data)
     except Exception as e:
         print(f"警告: 保存进度文件失败: {e}")
     
     translated_count = translated_count_local
     failed_count = failed_count_local
     
-    # 计算 speakers 统计信息（直接从 speakers_dict 计算）
-    if speakers_dict:
-        speakers_completed_total = sum(1 for v in speakers_dict.values() if v and v.strip())
-    
     if interrupted:
         print(f"\n翻译已中断，进度已保存!")
         print(f"  本次翻译文本: {translated_count} 个")
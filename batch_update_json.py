@@ -6,11 +6,18 @@
 """
 
 import json
+import mmap
+import os
 import sys
 import copy
 from pathlib import Path
 from typing import Dict, List, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 默认路径配置
 DEFAULT_JSON_FILE = Path("json/all.json")
 DEFAULT_TEXTS_DIR = Path("texts")
@@ -18,6 +25,33 @@ SPEAKERS_FILE = "speakers.json"
 SPEAKERS_TRANSLATED_FILE = "speakers_translated.json"
 TEXTS_FILE = "texts.json"
 TEXTS_TRANSLATED_FILE = "texts_translated.json"
+WRITE_BUFFER_SIZE = 1 << 20  # JSON 写入缓冲区大小（1MB）
+
+
+def load_json_file(path: Path) -> Any:
+    """
+    读取并解析 JSON 文件（优先使用 orjson）
+    有 orjson 时通过 mmap 直接解析文件映射，不再把整个文件复制一份到内存
+    """
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            # 空文件无法 mmap，交给 orjson 按空内容报错
+            if os.fstat(f.fileno()).st_size == 0:
+                return orjson.loads(b"")
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    return orjson.loads(view)
+    return json.loads(path.read_bytes())
+
+
+def save_json_file(path: Path, data: Any):
+    """在内存中序列化 JSON 后以大缓冲区一次写入（优先使用 orjson，格式与 indent=2 的 json.dump 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(content)
 
 
 def update_json_with_translations(
@@ -37,14 +71,22 @@ def update_json_with_translations(
     
     返回更新后的 JSON 数据
     """
-    # 创建对话翻译映射
+    # 创建对话翻译映射，键为 (msg_name, dialogue_index, seg_idx)，单段文本的 seg_idx 为 None
+    # id 格式为 "{msg}_dialogue_{i}" 或 "{msg}_dialogue_{i}_seg_{j}"，在这里解析一次，回填时不再拼接字符串
     dialogue_map = {}
+    dialogue_msgs = set()
     for dialogue in file_texts:
         msg_name = dialogue["msg"]
         dialogue_id = dialogue["id"]
-        if msg_name not in dialogue_map:
-            dialogue_map[msg_name] = {}
-        dialogue_map[msg_name][dialogue_id] = dialogue["text"]
+        prefix = msg_name + "_dialogue_"
+        if not dialogue_id.startswith(prefix):
+            continue
+        index_part, seg_sep, seg_part = dialogue_id[len(prefix):].partition("_seg_")
+        if not index_part.isdigit() or (seg_sep and not seg_part.isdigit()):
+            continue
+        seg_idx = int(seg_part) if seg_sep else None
+        dialogue_map[(msg_name, int(index_part), seg_idx)] = dialogue["text"]
+        dialogue_msgs.add(msg_name)
     
     # 更新 JSON 数据
     for msg_name in json_data["order"]:
@@ -60,7 +102,7 @@ def update_json_with_translations(
                 break
         
         # 更新 dialogue
-        if msg_name in dialogue_map:
+        if msg_name in dialogue_msgs:
             for line in msg_data["lines"]:
                 if line["type"] == "dialogue":
                     # 检查原始 text 是否是数组（多个文本段）
@@ -71,17 +113,18 @@ def update_json_with_translations(
                         # 多个文本段：查找各个文本段的翻译
                         translated_segments = []
                         for seg_idx in range(len(original_text)):
-                            seg_id = f"{msg_name}_dialogue_{dialogue_index}_seg_{seg_idx}"
-                            translated = dialogue_map[msg_name].get(seg_id)
+                            translated = dialogue_map.get((msg_name, dialogue_index, seg_idx))
                             translated_segments.append(translated if translated else original_text[seg_idx])
                         line["text"] = translated_segments
                     else:
                         # 单个文本段：查找翻译
-                        dialogue_id = f"{msg_name}_dialogue_{dialogue_index}"
-                        if dialogue_id in dialogue_map[msg_name]:
-                            line["text"] = dialogue_map[msg_name][dialogue_id]
+                        dialogue_key = (msg_name, dialogue_index, None)
+                        if dialogue_key in dialogue_map:
+                            line["text"] = dialogue_map[dialogue_key]
                     
-                    dialogue_index += 1
+                    # 与 extract_texts_for_translation 生成 id 时一致：只有含文本的行占用对话序号
+                    if is_multiple_segments or original_text:
+                        dialogue_index += 1
     
     return json_data
 
@@ -109,8 +152,7 @@ def batch_update_json(json_file: Path, texts_dir: Path, output_file: Path = None
     texts_dict = {}
     speakers_map = {}
     if texts_path.exists():
-        with open(texts_path, 'r', encoding='utf-8') as f:
-            texts_dict = json.load(f)
+        texts_dict = load_json_file(texts_path)
         print(f"已加载对话文本: {len(texts_dict)} 个文件")
         
         # 从 texts_dict 中提取 speaker 翻译映射
@@ -130,21 +172,19 @@ def batch_update_json(json_file: Path, texts_dir: Path, output_file: Path = None
     
     # 优先从 speakers_translated.json 读取
     if speakers_translated_path.exists():
-        with open(speakers_translated_path, 'r', encoding='utf-8') as f:
-            speakers_from_file = json.load(f)
-            # 更新 speakers_map，使用 speakers_translated.json 中的翻译
-            for original, translated in speakers_from_file.items():
-                if translated and translated.strip():  # 如果有非空翻译
-                    speakers_map[original] = translated
+        speakers_from_file = load_json_file(speakers_translated_path)
+        # 更新 speakers_map，使用 speakers_translated.json 中的翻译
+        for original, translated in speakers_from_file.items():
+            if translated and translated.strip():  # 如果有非空翻译
+                speakers_map[original] = translated
         print(f"已加载 Speaker 翻译映射: {len([v for v in speakers_map.values() if v])} 个（从 {SPEAKERS_TRANSLATED_FILE}）")
     elif speakers_path.exists():
         # 如果 speakers_translated.json 不存在，尝试从 speakers.json 读取
-        with open(speakers_path, 'r', encoding='utf-8') as f:
-            speakers_from_file = json.load(f)
-            # 更新 speakers_map，使用 speakers.json 中的翻译
-            for original, translated in speakers_from_file.items():
-                if translated and translated.strip():  # 如果有非空翻译
-                    speakers_map[original] = translated
+        speakers_from_file = load_json_file(speakers_path)
+        # 更新 speakers_map，使用 speakers.json 中的翻译
+        for original, translated in speakers_from_file.items():
+            if translated and translated.strip():  # 如果有非空翻译
+                speakers_map[original] = translated
         print(f"已加载 Speaker 翻译映射: {len([v for v in speakers_map.values() if v])} 个（从 {SPEAKERS_FILE}）")
     
     # 确定输出文件路径
@@ -156,8 +196,7 @@ def batch_update_json(json_file: Path, texts_dir: Path, output_file: Path = None
     print(f"输出文件: {output_file}")
     
     # 读取所有 JSON 数据
-    with open(json_file, 'r', encoding='utf-8') as f:
-        all_data = json.load(f)
+    all_data = load_json_file(json_file)
     
     # 深拷贝数据，避免修改原数据
     all_data = copy.deepcopy(all_data)
@@ -183,8 +222,7 @@ def batch_update_json(json_file: Path, texts_dir: Path, output_file: Path = None
             print(f"错误: 回填失败 {file_key}: {e}")
     
     # 保存更新后的 JSON 到新文件
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(all_data, f, ensure_ascii=False, indent=2)
+    save_json_file(output_file, all_data)
     
     print(f"\n回填完成: 成功 {updated_count} 个文件")
     print(f"输出文件: {output_file}")
@@ -4,11 +4,80 @@
 提取 .msg 文件为 JSON 格式，用于翻译
 """
 
+import bisect
 import json
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator, TextIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 行类型（显式驻留，所有解析结果共用同一个字符串对象）
+TYPE_SPEAKER = sys.intern("speaker")
+TYPE_DIALOGUE = sys.intern("dialogue")
+
+# comments 中文件开头注释的 key（其余注释以其前面的消息名为 key）
+HEADER_COMMENT_KEY = "__header__"
+# 翻译索引中 speaker 的 key（对话为 (对话序号, 文本段序号或 None)）
+SPEAKER_KEY = "speaker"
+
+# 预编译的正则表达式
+COLOR_MARKER_RE = re.compile(r'^\[color\([^)]+\)\]$')  # 单个颜色控制符，如 [color(yellow)]
+PLACEHOLDER_RE = re.compile(r'\{text\d+\}')  # 多文本段占位符 {text0}, {text1} 等
+# 消息块标题行（去除首尾空白后以 ':' 结尾且不以 '#' 开头），如 "MSG_001:"，对整个文件按行匹配
+HEADER_RE = re.compile(r'^(?![^\S\n]*#)[^\n]*:[^\S\n]*$', re.MULTILINE)
+# 标题行候选（bytes，只定位行内最后一个 ':'），命中后再解码该行用 HEADER_RE 确认
+HEADER_TAIL_RE = re.compile(rb':[^\n:]*$', re.MULTILINE)
+# 不含嵌套方括号/圆括号的控制符（绝大多数情况），如 [color(yellow)]、[wait]
+MARKER_RE = re.compile(r'\[(?:[^\[\]()]|\([^()]*\))*\]')
+# 按 MARKER_RE 切分一行，结果为文本与控制符交替的列表（奇数下标为控制符）
+MARKER_SPLIT_RE = re.compile(f'({MARKER_RE.pattern})')
+
+
+def load_json_file(path: Path) -> Any:
+    """一次性读取 JSON 文件字节并解析（优先使用 orjson）"""
+    data = path.read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def save_json_file(path: Path, data: Any):
+    """将数据写为缩进 2 的 JSON 文件（优先使用 orjson，输出与 json.dump(indent=2, ensure_ascii=False) 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(content)
+
+
+def scan_marker(line: str, start: int) -> int:
+    """从 line[start] 处的 '[' 开始匹配完整控制符，返回控制符结束位置；控制符不完整时返回 -1"""
+    match = MARKER_RE.match(line, start)
+    if match:
+        return match.end()
+    
+    # 含嵌套方括号或圆括号的控制符，逐字符匹配
+    depth = 1
+    paren_depth = 0
+    j = start + 1
+    while j < len(line) and depth > 0:
+        if line[j] == '[' and paren_depth == 0:
+            depth += 1
+        elif line[j] == ']' and paren_depth == 0:
+            depth -= 1
+        elif line[j] == '(':
+            paren_depth += 1
+        elif line[j] == ')':
+            paren_depth -= 1
+        j += 1
+    
+    return j if depth == 0 else -1
 
 
 def extract_markers(line: str) -> tuple[str, list[str], list[str]]:
@@ -17,40 +86,28 @@ def extract_markers(line: str) -> tuple[str, list[str], list[str]]:
     markers_after = []
     text_parts = []
     text_started = False
-    i = 0
+    text_start = 0
+    pos = 0
     
-    while i < len(line):
-        if line[i] == '[':
-            depth = 1
-            paren_depth = 0
-            j = i + 1
-            
-            while j < len(line) and depth > 0:
-                if line[j] == '[' and paren_depth == 0:
-                    depth += 1
-                elif line[j] == ']' and paren_depth == 0:
-                    depth -= 1
-                elif line[j] == '(':
-                    paren_depth += 1
-                elif line[j] == ')':
-                    paren_depth -= 1
-                j += 1
-            
-            if depth == 0:
-                marker = line[i:j]
-                (markers_after if text_started else markers_before).append(marker)
-                i = j
-            else:
-                if line[i].strip():
-                    text_started = True
-                text_parts.append(line[i])
-                i += 1
-        else:
-            if line[i].strip():
+    while True:
+        i = line.find('[', pos)
+        if i == -1:
+            break
+        end = scan_marker(line, i)
+        if end == -1:
+            # 不完整的控制符按普通文本处理
+            pos = i + 1
+            continue
+        
+        text = line[text_start:i]
+        if text:
+            text_parts.append(text)
+            if not text_started and not text.isspace():
                 text_started = True
-            text_parts.append(line[i])
-            i += 1
+        (markers_after if text_started else markers_before).append(line[i:end])
+        text_start = pos = end
     
+    text_parts.append(line[text_start:])
     return ''.join(text_parts).strip(), markers_before, markers_after
 
 
@@ -62,13 +119,12 @@ def is_first_line_speaker(line: str) -> Optional[Dict[str, Any]]:
     text, markers_before, markers_after = extract_markers(line)
     all_markers = markers_before + markers_after
     
-    color_pattern = re.compile(r'^\[color\([^)]+\)\]$')
-    color_markers = [m for m in all_markers if color_pattern.match(m)]
+    color_markers = [m for m in all_markers if COLOR_MARKER_RE.match(m)]
     
     if len(color_markers) >= 2:
         format_str = color_markers[0] + '{text}' + color_markers[-1]
         return {
-            "type": "speaker",
+            "type": TYPE_SPEAKER,
             "text": text,
             "format": format_str
         }
@@ -79,124 +135,137 @@ def is_first_line_speaker(line: str) -> Optional[Dict[str, Any]]:
 def parse_line(line: str) -> Optional[Dict[str, Any]]:
     """解析单行消息，遇到控制符进行分块，提取所有文本段"""
     line = line.rstrip()
-    if not line.strip():
+    # rstrip 之后非空即说明有非空白字符，无需再 strip 一次
+    if not line:
         return None
     
-    # 提取所有文本段和控制符
+    # 提取所有文本段和控制符，遇到控制符时将之前的文本作为一个文本段
     text_segments = []
     format_parts = []
-    i = 0
-    current_text = ""
     
-    while i < len(line):
-        if line[i] == '[':
-            # 遇到控制符，先保存当前文本段
-            if current_text.strip():
-                text_segments.append(current_text.strip())
-                format_parts.append(f"{{text{len(text_segments)-1}}}")
-            current_text = ""
+    parts = MARKER_SPLIT_RE.split(line)
+    if line.count('[') == len(parts) >> 1:
+        # 每个 '[' 都是一个普通控制符的开头（绝大多数行）：直接使用正则切分的结果（文本与控制符交替）
+        parts = iter(parts)
+        text = next(parts).strip()
+        if text:
+            text_segments.append(text)
+            format_parts.append("{text0}")
+        for marker in parts:
+            format_parts.append(marker)
+            text = next(parts).strip()
+            if text:
+                format_parts.append(f"{{text{len(text_segments)}}}")
+                text_segments.append(text)
+    else:
+        # 含不完整或嵌套的控制符时逐个 '[' 扫描
+        text_start = 0
+        pos = 0
+        
+        while True:
+            i = line.find('[', pos)
+            if i == -1:
+                break
             
-            # 解析控制符
-            depth = 1
-            paren_depth = 0
-            j = i + 1
-            while j < len(line) and depth > 0:
-                if line[j] == '[' and paren_depth == 0:
-                    depth += 1
-                elif line[j] == ']' and paren_depth == 0:
-                    depth -= 1
-                elif line[j] == '(':
-                    paren_depth += 1
-                elif line[j] == ')':
-                    paren_depth -= 1
-                j += 1
+            # 遇到 '[' 时先结束当前文本段
+            text = line[text_start:i].strip()
+            if text:
+                text_segments.append(text)
+                format_parts.append(f"{{text{len(text_segments)-1}}}")
             
-            if depth == 0:
-                marker = line[i:j]
-                format_parts.append(marker)
-                i = j
+            end = scan_marker(line, i)
+            if end == -1:
+                # 不完整的控制符按普通文本处理，作为新文本段的开头
+                text_start = i
+                pos = i + 1
             else:
-                current_text += line[i]
-                i += 1
-        else:
-            current_text += line[i]
-            i += 1
-    
-    # 处理最后的文本段
-    if current_text.strip():
-        text_segments.append(current_text.strip())
-        format_parts.append(f"{{text{len(text_segments)-1}}}")
+                marker = line[i:end]
+                format_parts.append(marker)
+                text_start = pos = end
+        
+        # 处理最后的文本段
+        text = line[text_start:].strip()
+        if text:
+            text_segments.append(text)
+            format_parts.append(f"{{text{len(text_segments)-1}}}")
     
-    # 如果没有文本段，只有控制符
     if not text_segments:
-        return {
-            "type": "dialogue",
+        # 没有文本段，只有控制符
+        parsed = {
+            "type": TYPE_DIALOGUE,
             "text": "",
             "format": ''.join(format_parts)
         }
-    
-    # 如果有多个文本段，使用数组存储；如果只有一个，保持兼容性
-    if len(text_segments) == 1:
+    elif len(text_segments) == 1:
+        # 只有一个文本段，保持兼容性
         format_str = ''.join(format_parts).replace("{text0}", "{text}")
-        return {
-            "type": "dialogue",
+        parsed = {
+            "type": TYPE_DIALOGUE,
             "text": text_segments[0],
             "format": format_str
         }
     else:
-        return {
-            "type": "dialogue",
+        # 有多个文本段，使用数组存储
+        parsed = {
+            "type": TYPE_DIALOGUE,
             "text": text_segments,  # 数组
             "format": ''.join(format_parts)  # 包含 {text0}, {text1} 等
         }
+    
+    return parsed
+
+
+def renumber_placeholders(format_str: str, offset: int) -> str:
+    """将格式字符串中的 {textN} 占位符重新编号为 {text(N+offset)}"""
+    if not offset:
+        return format_str
+    return PLACEHOLDER_RE.sub(lambda m: f"{{text{int(m.group()[5:-1]) + offset}}}", format_str)
 
 
 def merge_tab_dialogues(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """合并连续的 [tab] dialogue 行，保留所有控制符和所有文本段"""
     result = []
+    line_count = len(lines)
     i = 0
     
-    while i < len(lines):
+    while i < line_count:
         line = lines[i]
-        if line.get("type") == "dialogue" and "[tab]" in line.get("format", ""):
-            # 收集连续的 [tab] dialogue
+        format_str = line.get("format", "")
+        if line.get("type") == TYPE_DIALOGUE and "[tab]" in format_str:
+            # 收集连续的 [tab] dialogue（line/format_str 始终为当前行及其格式，每行只读取一次）
             format_parts = []
             all_text_segments = []
             
-            while i < len(lines) and lines[i].get("type") == "dialogue" and "[tab]" in lines[i].get("format", ""):
-                format_str = lines[i].get("format", "")
-                text = lines[i].get("text", "")
+            while True:
+                text = line.get("text", "")
                 
-                # 获取所有文本段并展开格式字符串
+                # 占位符按合并后的文本段顺序重新编号，不展开格式字符串
+                offset = len(all_text_segments)
                 if isinstance(text, list):
                     all_text_segments.extend(text)
-                    # 展开格式：替换 {text0}, {text1} 等为实际文本
-                    expanded = format_str
-                    for idx, seg in enumerate(text):
-                        expanded = expanded.replace(f"{{text{idx}}}", seg, 1)
+                    format_parts.append(renumber_placeholders(format_str, offset))
+                elif text:
+                    all_text_segments.append(text)
+                    format_parts.append(format_str.replace("{text}", f"{{text{offset}}}"))
                 else:
-                    if text:
-                        all_text_segments.append(text)
-                    expanded = format_str.replace("{text}", text)
+                    format_parts.append(format_str.replace("{text}", ""))
                 
-                format_parts.append(expanded)
                 i += 1
+                if i >= line_count:
+                    break
+                line = lines[i]
+                format_str = line.get("format", "")
+                if not (line.get("type") == TYPE_DIALOGUE and "[tab]" in format_str):
+                    break
             
-            # 合并所有格式字符串（已展开的完整格式）
-            merged_format_expanded = "".join(format_parts)
-            
-            # 将合并后的格式字符串中的文本段替换为占位符（从后往前替换）
-            merged_format = merged_format_expanded
-            for text_idx in range(len(all_text_segments) - 1, -1, -1):
-                seg = all_text_segments[text_idx]
-                pos = merged_format.rfind(seg)
-                if pos != -1:
-                    placeholder = "{text}" if (text_idx == 0 and len(all_text_segments) == 1) else f"{{text{text_idx}}}"
-                    merged_format = merged_format[:pos] + placeholder + merged_format[pos + len(seg):]
+            # 合并所有格式字符串，只有一个文本段时使用 {text}
+            merged_format = "".join(format_parts)
+            if len(all_text_segments) == 1:
+                merged_format = merged_format.replace("{text0}", "{text}")
             
             # 构建结果
             result.append({
-                "type": "dialogue",
+                "type": TYPE_DIALOGUE,
                 "text": all_text_segments[0] if len(all_text_segments) == 1 else all_text_segments,
                 "format": merged_format
             })
@@ -207,147 +276,245 @@ def merge_tab_dialogues(lines: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     return result
 
 
+def split_format(line: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    只有一个 {text} 占位符的行，将 format 拆为 format_prefix / format_suffix（重组时直接拼接，无需查找替换）
+    其余行（多文本段、无文本段）保留 format
+    """
+    format_str = line.get("format", "")
+    if isinstance(line.get("text"), str) and format_str.count("{text}") == 1 and not PLACEHOLDER_RE.search(format_str):
+        prefix, _, suffix = format_str.partition("{text}")
+        return {
+            "type": line["type"],
+            "text": line["text"],
+            "format_prefix": prefix,
+            "format_suffix": suffix
+        }
+    return line
+
+
+def scan_headers(data: bytes) -> Dict[int, str]:
+    """对整个文件内容（bytes）做一次正则扫描，返回所有可能的消息块标题行 {行号: 去除首尾空白的标题行}"""
+    headers = {}
+    line_no = 0
+    last_pos = 0
+    for match in HEADER_TAIL_RE.finditer(data):
+        line_start = data.rfind(b'\n', 0, match.start()) + 1
+        # 只解码候选行本身
+        line = data[line_start:match.end()].decode('utf-8')
+        if not HEADER_RE.fullmatch(line):
+            continue
+        line_no += data.count(b'\n', last_pos, line_start)
+        last_pos = line_start
+        headers[line_no] = line.strip()
+    return headers
+
+
 def parse_msg_file(file_path: Path) -> Dict[str, Any]:
     """解析 .msg 文件为 JSON"""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        lines = f.read().split('\n')
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    # 与文本模式读取一致，统一换行符
+    if b'\r' in data:
+        data = data.replace(b'\r\n', b'\n').replace(b'\r', b'\n')
     
-    result = {"comments": [], "messages": {}, "order": []}
-    i = 0
+    # 标题行一次性扫描得到；消息内容中（[end] 之前）的同样格式的行不算标题，查找时只看 start 之后的
+    headers = scan_headers(data)
+    lines = data.decode('utf-8').split('\n')
+    header_lines = list(headers)
+    
+    def find_header(start: int) -> tuple[int, str]:
+        """查找 start 行及之后的第一个标题行，返回 (行号, 标题行)；找不到时返回 (len(lines), "")"""
+        k = bisect.bisect_left(header_lines, start)
+        if k == len(header_lines):
+            return len(lines), ""
+        return header_lines[k], headers[header_lines[k]]
+    
+    result = {"comments": {}, "messages": {}, "order": []}
     
     # 文件开头注释
-    while i < len(lines) and not (lines[i].strip().endswith(':') and not lines[i].strip().startswith('#')):
-        i += 1
-    result["comments"].append('\n'.join(lines[:i]))
+    i, header = find_header(0)
+    result["comments"][HEADER_COMMENT_KEY] = '\n'.join(lines[:i])
     
-    # 解析消息块
+    # 解析消息块（每次循环开始时 lines[i] 都是标题行，header 为其去除空白后的内容）
     while i < len(lines):
-        line = lines[i].strip()
-        if line.endswith(':') and not line.startswith('#'):
-            msg_name = line[:-1].strip()
-            i += 1
+        msg_name = header[:-1].strip()
+        i += 1
+        
+        # 收集消息行
+        msg_lines = []
+        is_first_line = True
+        while i < len(lines):
+            line = lines[i]
+            # 消息结束标记直接在原始行上查找（行中任何 "[end]" 子串都必然落在某个控制符内）
+            is_end = '[end]' in line
             
-            # 收集消息行
-            msg_lines = []
-            is_first_line = True
-            while i < len(lines):
-                if is_first_line:
-                    speaker_parsed = is_first_line_speaker(lines[i])
+            # 含 [end] 的第一行是单行消息，不作为 speaker
+            if is_first_line:
+                is_first_line = False
+                if not is_end:
+                    speaker_parsed = is_first_line_speaker(line)
                     if speaker_parsed:
                         msg_lines.append(speaker_parsed)
-                        is_first_line = False
-                        if '[end]' in speaker_parsed.get("format", ""):
-                            i += 1
-                            break
                         i += 1
                         continue
-                    is_first_line = False
-                
-                parsed = parse_line(lines[i])
-                if parsed:
-                    msg_lines.append(parsed)
-                    if '[end]' in parsed.get("format", ""):
-                        i += 1
-                        break
-                i += 1
             
-            # 合并 [tab] dialogue
-            result["messages"][msg_name] = {"lines": merge_tab_dialogues(msg_lines)}
-            result["order"].append(msg_name)
-            
-            # 消息后注释
-            comment_start = i
-            while i < len(lines) and not (lines[i].strip().endswith(':') and not lines[i].strip().startswith('#')):
-                i += 1
-            result["comments"].append('\n'.join(lines[comment_start:i]))
-        else:
+            parsed = parse_line(line)
+            if parsed:
+                msg_lines.append(parsed)
             i += 1
+            if is_end:
+                break
+        
+        # 合并 [tab] dialogue，再拆分单文本段行的格式
+        result["messages"][msg_name] = {"lines": [split_format(line) for line in merge_tab_dialogues(msg_lines)]}
+        result["order"].append(msg_name)
+        
+        # 消息后注释
+        comment_start = i
+        i, header = find_header(i)
+        result["comments"][msg_name] = '\n'.join(lines[comment_start:i])
     
     return result
 
 
-def extract_texts_for_translation(json_data: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
-    """提取文本用于翻译"""
+def extract_texts_for_translation(json_data: Dict[str, Any]) -> Dict[str, Dict[str, List[str]]]:
+    """提取文本用于翻译，每个消息块为列式结构 {"ids": [...], "texts": [...]}（两个列表一一对应）"""
     texts = {}
     
     for msg_name in json_data["order"]:
+        ids = []
         msg_texts = []
         dialogue_idx = 0
         
         for line in json_data["messages"][msg_name]["lines"]:
-            if line["type"] == "speaker":
-                msg_texts.append({"id": f"{msg_name}_speaker", "text": line["text"]})
-            elif line["type"] == "dialogue":
+            if line["type"] == TYPE_SPEAKER:
+                ids.append(f"{msg_name}_speaker")
+                msg_texts.append(line["text"])
+            elif line["type"] == TYPE_DIALOGUE:
                 text = line.get("text")
                 # 处理多个文本段（数组）或单个文本段（字符串）
                 if isinstance(text, list):
                     # 多个文本段
                     for seg_idx, seg in enumerate(text):
                         if seg:
-                            msg_texts.append({"id": f"{msg_name}_dialogue_{dialogue_idx}_seg_{seg_idx}", "text": seg})
+                            ids.append(f"{msg_name}_dialogue_{dialogue_idx}_seg_{seg_idx}")
+                            msg_texts.append(seg)
                     dialogue_idx += 1
                 elif text:
                     # 单个文本段
-                    msg_texts.append({"id": f"{msg_name}_dialogue_{dialogue_idx}", "text": text})
+                    ids.append(f"{msg_name}_dialogue_{dialogue_idx}")
+                    msg_texts.append(text)
                     dialogue_idx += 1
         
-        if msg_texts:
-            texts[msg_name] = msg_texts
+        if ids:
+            texts[msg_name] = {"ids": ids, "texts": msg_texts}
     
     return texts
 
 
-def find_translated_text(translated_texts: Optional[Dict], msg_name: str, item_id: str) -> Optional[str]:
-    """查找翻译文本"""
-    if not translated_texts or msg_name not in translated_texts:
-        return None
-    for item in translated_texts[msg_name]:
-        if item["id"] == item_id:
-            return item["text"]
-    return None
+def build_translation_index(translated_texts: Optional[Dict]) -> Dict[str, Dict[Any, str]]:
+    """
+    将翻译文本构建为 {msg_name: {key: text}} 索引，同一 id 出现多次时以第一次为准
+    id 在这里解析一次，重组时按整数查找，不再逐行拼接 id 字符串：
+    "{msg}_speaker" -> SPEAKER_KEY，"{msg}_dialogue_{i}" -> (i, None)，"{msg}_dialogue_{i}_seg_{j}" -> (i, j)
+    支持列式结构 {"ids": [...], "texts": [...]}，以及旧格式 [{"id": ..., "text": ...}, ...]
+    """
+    if not isinstance(translated_texts, dict):
+        return {}
+    index = {}
+    for msg_name, entry in translated_texts.items():
+        if isinstance(entry, dict):
+            items = zip(reversed(entry["ids"]), reversed(entry["texts"]))
+        else:
+            items = ((item["id"], item["text"]) for item in reversed(entry))
+        
+        speaker_id = msg_name + "_speaker"
+        dialogue_prefix = msg_name + "_dialogue_"
+        msg_index = {}
+        for item_id, text in items:
+            if item_id == speaker_id:
+                msg_index[SPEAKER_KEY] = text
+            elif item_id.startswith(dialogue_prefix):
+                index_part, seg_sep, seg_part = item_id[len(dialogue_prefix):].partition("_seg_")
+                if not index_part.isdigit() or (seg_sep and not seg_part.isdigit()):
+                    continue
+                msg_index[(int(index_part), int(seg_part) if seg_sep else None)] = text
+        index[msg_name] = msg_index
+    return index
 
 
-def rebuild_msg_file(json_data: Dict[str, Any], translated_texts: Dict[str, List[Dict[str, str]]] = None) -> str:
-    """重组 .msg 文件"""
-    lines = []
+def comments_from_list(comments: List[str], order: List[str]) -> Dict[str, str]:
+    """将旧格式的注释列表（第 0 项为文件开头注释，之后依次对应 order 中的消息）转换为按消息名索引的字典"""
+    result = {}
+    if comments:
+        result[HEADER_COMMENT_KEY] = comments[0]
+    for msg_name, comment in zip(order, comments[1:]):
+        result[msg_name] = comment
+    return result
+
+
+def iter_msg_lines(json_data: Dict[str, Any], translated_texts: Dict[str, List[Dict[str, str]]] = None,
+                   translation_index: Dict[str, Dict[Any, str]] = None) -> Iterator[str]:
+    """
+    重组 .msg 文件，逐行产出文件内容（不含换行符）
+    已用 build_translation_index 建好索引时可直接传入 translation_index，此时忽略 translated_texts
+    """
+    comments = json_data["comments"]
+    if isinstance(comments, list):
+        # 兼容旧格式 JSON
+        comments = comments_from_list(comments, json_data["order"])
+    
+    if HEADER_COMMENT_KEY in comments:
+        yield comments[HEADER_COMMENT_KEY]
     
-    if json_data["comments"]:
-        lines.append(json_data["comments"][0])
+    # 翻译文本索引，查找时不再逐条遍历
+    if translation_index is None:
+        translation_index = build_translation_index(translated_texts)
     
-    comment_idx = 1
     for msg_name in json_data["order"]:
-        lines.append(f"{msg_name}:")
+        yield f"{msg_name}:"
+        msg_translations = translation_index.get(msg_name, {})
         
         dialogue_idx = 0
         for line in json_data["messages"][msg_name]["lines"]:
-            if line["type"] == "speaker":
-                text = find_translated_text(translated_texts, msg_name, f"{msg_name}_speaker") or line["text"]
-                lines.append(line["format"].replace("{text}", text))
-            elif line["type"] == "dialogue":
-                format_str = line["format"]
+            if line["type"] == TYPE_SPEAKER:
+                text = msg_translations.get(SPEAKER_KEY) or line["text"]
+                if "format_prefix" in line:
+                    yield line["format_prefix"] + text + line["format_suffix"]
+                else:
+                    # 旧格式 JSON（format 中含 {text}）
+                    yield line["format"].replace("{text}", text)
+            elif line["type"] == TYPE_DIALOGUE:
                 text = line.get("text", "")
                 
                 # 处理多个文本段（数组）或单个文本段（字符串）
-                if isinstance(text, list):
+                if "format_prefix" in line:
+                    # 单个文本段，格式已在解析时拆分
+                    translated = msg_translations.get((dialogue_idx, None)) or text
+                    format_str = line["format_prefix"] + (translated or "") + line["format_suffix"]
+                elif isinstance(text, list):
                     # 多个文本段：替换 {text0}, {text1} 等
+                    format_str = line["format"]
                     for seg_idx, seg in enumerate(text):
-                        translated = find_translated_text(translated_texts, msg_name, f"{msg_name}_dialogue_{dialogue_idx}_seg_{seg_idx}") or seg
+                        translated = msg_translations.get((dialogue_idx, seg_idx)) or seg
                         format_str = format_str.replace(f"{{text{seg_idx}}}", translated, 1)
                 else:
-                    # 单个文本段：检查是否有多个占位符（数据不一致的情况）
-                    if re.search(r'\{text\d+\}', format_str):
+                    # 单个文本段（旧格式 JSON 或无法拆分的格式）：检查是否有多个占位符（数据不一致的情况）
+                    format_str = line["format"]
+                    if '{text' in format_str and PLACEHOLDER_RE.search(format_str):
                         # format 中有多个占位符，尝试从翻译文本中查找各个文本段
                         seg_idx = 0
                         while True:
                             placeholder = f"{{text{seg_idx}}}"
                             if placeholder not in format_str:
                                 break
-                            seg_translated = find_translated_text(translated_texts, msg_name, f"{msg_name}_dialogue_{dialogue_idx}_seg_{seg_idx}")
+                            seg_translated = msg_translations.get((dialogue_idx, seg_idx))
                             if seg_translated:
                                 format_str = format_str.replace(placeholder, seg_translated, 1)
                             elif seg_idx == 0:
                                 # 第一个占位符使用整个文本
-                                translated = find_translated_text(translated_texts, msg_name, f"{msg_name}_dialogue_{dialogue_idx}") or text
+                                translated = msg_translations.get((dialogue_idx, None)) or text
                                 format_str = format_str.replace(placeholder, translated or "", 1)
                             else:
                                 # 其他占位符用空字符串替换
@@ -355,25 +522,49 @@ def rebuild_msg_file(json_data: Dict[str, Any], translated_texts: Dict[str, List
                             seg_idx += 1
                     else:
                         # 单个占位符 {text}
-                        translated = find_translated_text(translated_texts, msg_name, f"{msg_name}_dialogue_{dialogue_idx}") or text
+                        translated = msg_translations.get((dialogue_idx, None)) or text
                         format_str = format_str.replace("{text}", translated or "")
                 
-                # 清理任何剩余的未替换占位符
-                format_str = re.sub(r'\{text\d+\}', '', format_str)
+                # 清理任何剩余的未替换占位符（先用子串判断，绝大多数行无需正则替换）
+                if '{text' in format_str:
+                    format_str = PLACEHOLDER_RE.sub('', format_str)
                 
-                lines.append(format_str)
-                dialogue_idx += 1
+                yield format_str
+                # 与 extract_texts_for_translation 一致：只有含文本的行占用对话序号
+                if text or isinstance(text, list):
+                    dialogue_idx += 1
             elif line.get("format"):
-                lines.append(line["format"])
+                yield line["format"]
         
         # 添加注释或空行
-        if comment_idx < len(json_data["comments"]):
-            lines.append(json_data["comments"][comment_idx] or "")
-        else:
-            lines.append("")
-        comment_idx += 1
-    
-    return '\n'.join(lines)
+        yield comments.get(msg_name) or ""
+
+
+
+def write_msg_file(json_data: Dict[str, Any], out_fp: TextIO, translated_texts: Dict[str, List[Dict[str, str]]] = None,
+                   translation_index: Dict[str, Dict[Any, str]] = None):
+    """重组 .msg 文件并逐行写入 out_fp（行之间以换行分隔，末尾不追加换行），不在内存中拼接整个文件"""
+    lines = iter_msg_lines(json_data, translated_texts, translation_index)
+    first_line = next(lines, None)
+    if first_line is None:
+        return
+    out_fp.write(first_line)
+    for line in lines:
+        out_fp.write('\n')
+        out_fp.write(line)
+
+
+def rebuild_msg_file(json_data: Dict[str, Any], translated_texts: Dict[str, List[Dict[str, str]]] = None) -> str:
+    """重组 .msg 文件，返回完整文件内容"""
+    return '\n'.join(iter_msg_lines(json_data, translated_texts))
+
+
+def translate_msg_file(input_file: Path, output_file: Path, translated_texts: Dict[str, List[Dict[str, str]]] = None,
+                       translation_index: Dict[str, Dict[Any, str]] = None):
+    """解析 .msg 文件后直接按翻译文本重组输出，不经过中间 JSON 文件"""
+    json_data = parse_msg_file(input_file)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        write_msg_file(json_data, f, translated_texts, translation_index)
 
 
 if __name__ == "__main__":
@@ -382,6 +573,7 @@ if __name__ == "__main__":
         print("命令:")
         print("  extract <input.msg> <output.json>  - 提取 .msg 为 JSON")
         print("  rebuild <input.json> <output.msg> [translated.json] - 重组 JSON 为 .msg")
+        print("  translate <input.msg> <translated.json> <output.msg> - 直接用翻译文本重组 .msg（不生成中间 JSON）")
         sys.exit(1)
     
     command = sys.argv[1]
@@ -395,8 +587,7 @@ if __name__ == "__main__":
         output_file = Path(sys.argv[3])
         
         print(f"正在提取: {input_file} -> {output_file}")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(parse_msg_file(input_file), f, ensure_ascii=False, indent=2)
+        save_json_file(output_file, parse_msg_file(input_file))
         print(f"提取完成: {output_file}")
     
     elif command == "rebuild":
@@ -409,16 +600,31 @@ if __name__ == "__main__":
         translated_file = Path(sys.argv[4]) if len(sys.argv) > 4 else None
         
         print(f"正在重组: {input_file} -> {output_file}")
-        with open(input_file, 'r', encoding='utf-8') as f:
-            json_data = json.load(f)
+        json_data = load_json_file(input_file)
         
-        translated_texts = None
+        # 读入翻译文本后立即建立索引
+        translation_index = {}
         if translated_file and translated_file.exists():
-            with open(translated_file, 'r', encoding='utf-8') as f:
-                translated_texts = json.load(f)
+            translation_index = build_translation_index(load_json_file(translated_file))
         
         with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(rebuild_msg_file(json_data, translated_texts))
+            write_msg_file(json_data, f, translation_index=translation_index)
+        print(f"重组完成: {output_file}")
+    
+    elif command == "translate":
+        if len(sys.argv) < 5:
+            print("错误: translate 需要输入文件、翻译文本和输出文件")
+            sys.exit(1)
+        
+        input_file = Path(sys.argv[2])
+        translated_file = Path(sys.argv[3])
+        output_file = Path(sys.argv[4])
+        
+        print(f"正在翻译重组: {input_file} -> {output_file}")
+        # 读入翻译文本后立即建立索引
+        translation_index = build_translation_index(load_json_file(translated_file))
+        
+        translate_msg_file(input_file, output_file, translation_index=translation_index)
         print(f"重组完成: {output_file}")
     
     else:
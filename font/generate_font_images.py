@@ -7,16 +7,50 @@
 
 import json
 import os
+from multiprocessing import Pool
 from PIL import Image, ImageDraw, ImageFont
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # 字符网格大小
 CHAR_SIZE = 16  # 每个字符 16x16 像素
 GRID_SIZE = 16  # 16x16 网格
 IMAGE_SIZE = CHAR_SIZE * GRID_SIZE  # 256x256 像素
 
+# 子进程中使用的字体（由 init_page_worker 加载，字体对象无法跨进程传递）
+WORKER_FONT = None
+
+def load_json_file(path):
+    """读取并解析 JSON 文件（优先使用 orjson）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def save_json_file(path, data):
+    """将数据写为缩进 2 的 JSON 文件（优先使用 orjson，输出与 json.dump(indent=2, ensure_ascii=False) 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(content)
+
 def analyze_char(char_img):
     """分析单个字符图片，返回 left 和 width（与生成图片时同步）"""
+    if char_img.mode == 'RGBA':
+        # 直接取 alpha 通道中非透明像素的边界框（right 为开区间，即 maxx + 1）
+        bbox = char_img.getchannel('A').getbbox()
+        if bbox is None:
+            return 0, 4  # 默认空格宽度
+        left, _, right, _ = bbox
+        return left, min(right - left + 1, 14)
+    
     # 找到最左边和最右边的非透明像素
     minx = CHAR_SIZE
     maxx = 0
@@ -68,30 +102,27 @@ def load_font(font_path, size=12):
         except:
             return None
 
-def render_char(char, font, char_size=16, font_size=12):
-    """渲染单个字符到图片（像素字体，左对齐，与游戏渲染逻辑一致）"""
-    if not char or char == "":
-        # 空字符，返回透明图片
-        return Image.new('RGBA', (char_size, char_size), (0, 0, 0, 0))
+def render_char(char, font, char_img, char_draw):
+    """渲染单个字符到 char_img（像素字体，左对齐，与游戏渲染逻辑一致），char_img 会先被清空以便复用"""
+    char_size = char_img.width
+    
+    # 清空为透明
+    char_img.paste((0, 0, 0, 0), (0, 0, char_size, char_size))
     
-    # 创建临时图片用于测量字符边界框
-    temp_img = Image.new('RGBA', (char_size * 2, char_size * 2), (0, 0, 0, 0))
-    temp_draw = ImageDraw.Draw(temp_img)
+    if not char or char == "":
+        # 空字符，保持透明
+        return
     
-    # 获取字符边界框（包括 left bearing）
+    # 获取字符边界框（包括 left bearing），直接在复用的图片上测量，不再创建临时图片
     try:
-        bbox = temp_draw.textbbox((0, 0), char, font=font)
+        bbox = char_draw.textbbox((0, 0), char, font=font)
         # bbox 返回 (left, top, right, bottom)
         # left 可能是负数（字符超出左边界）
         text_left = bbox[0]
         text_top = bbox[1]  # top 可能是负数（字符超出上边界）
-        text_width = bbox[2] - bbox[0]
-        text_height = bbox[3] - bbox[1]
     except:
         text_left = 0
         text_top = 0
-        text_width = char_size
-        text_height = char_size
     
     # Y方向：顶部对齐（与游戏渲染逻辑一致）
     # 如果 top bearing 为负（字符超出上边界），需要调整渲染位置
@@ -102,24 +133,22 @@ def render_char(char, font, char_size=16, font_size=12):
     x_offset = 0
     render_x = x_offset - min(0, text_left)
     
-    # 创建字符图片
-    char_img = Image.new('RGBA', (char_size, char_size), (0, 0, 0, 0))
-    char_draw = ImageDraw.Draw(char_img)
-    
     # 渲染字符（左对齐，顶部对齐）
     try:
         char_draw.text((render_x, y_offset), char, font=font, fill=(255, 255, 255, 255))
     except Exception as e:
         print(f"警告: 无法渲染字符 '{char}': {e}")
-        return Image.new('RGBA', (char_size, char_size), (0, 0, 0, 0))
-    
-    return char_img
+        char_img.paste((0, 0, 0, 0), (0, 0, char_size, char_size))
 
 def generate_font_page(page_num, page_data, font, output_path, font_info_list=None):
     """生成单个字体页面图片，同时收集字体信息"""
     # 创建 256x256 的图片
     img = Image.new('RGBA', (IMAGE_SIZE, IMAGE_SIZE), (0, 0, 0, 0))
     
+    # 所有字符复用同一张 16x16 图片渲染，渲染后直接在同一份像素上分析 left/width
+    char_img = Image.new('RGBA', (CHAR_SIZE, CHAR_SIZE), (0, 0, 0, 0))
+    char_draw = ImageDraw.Draw(char_img)
+    
     # 遍历 16x16 网格
     for y in range(GRID_SIZE):
         if y >= len(page_data):
@@ -131,22 +160,22 @@ def generate_font_page(page_num, page_data, font, output_path, font_info_list=No
             
             char = row[x]
             
-            # 计算字符编码
-            char_code = page_num * 256 + y * 16 + x
+            # 空位置既不粘贴也不记录字体信息
+            if char == "":
+                continue
             
             # 渲染字符（使用12px字体，渲染到16x16格子）
-            char_img = render_char(char, font, CHAR_SIZE, font_size=12)
+            render_char(char, font, char_img, char_draw)
             
             # 计算在图片中的位置
             x_pos = x * CHAR_SIZE
             y_pos = y * CHAR_SIZE
             
-            # 将字符图片粘贴到主图片上（只有非空字符才粘贴）
-            if char != "":
-                img.paste(char_img, (x_pos, y_pos), char_img)
+            # 将字符图片粘贴到主图片上
+            img.paste(char_img, (x_pos, y_pos), char_img)
             
-            # 分析字符并添加到 font_info（只处理非空字符）
-            if font_info_list is not None and char != "":
+            # 分析字符并添加到 font_info
+            if font_info_list is not None:
                 left, width = analyze_char(char_img)
                 
                 font_info_list.append({
@@ -155,10 +184,22 @@ def generate_font_page(page_num, page_data, font, output_path, font_info_list=No
                     "width": width
                 })
     
-    # 保存图片
-    img.save(output_path, 'PNG')
+    # 保存图片（字体图集用最快的压缩级别即可，体积相差不大）
+    img.save(output_path, 'PNG', compress_level=1)
     print(f"已生成: {output_path} (页码 {page_num})")
 
+def init_page_worker(font_path):
+    """页面生成子进程初始化：每个子进程只加载一次字体"""
+    global WORKER_FONT
+    WORKER_FONT = load_font(font_path, size=12)
+
+def process_page(args):
+    """在子进程中生成单个页面图片，返回该页的字体信息"""
+    page_num, page_data, output_path = args
+    page_font_info = []
+    generate_font_page(page_num, page_data, WORKER_FONT, output_path, page_font_info)
+    return page_font_info
+
 def main():
     # 路径配置
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -178,8 +219,7 @@ def main():
     
     # 加载 font.json
     print(f"加载字体映射: {font_json_path}")
-    with open(font_json_path, 'r', encoding='utf-8') as f:
-        font_data = json.load(f)
+    font_data = load_json_file(font_json_path)
     
     # 加载字体（像素字体通常使用12px）
     print(f"加载字体文件: {font_path}")
@@ -197,6 +237,7 @@ def main():
     
     print(f"\n开始生成字体图片 (页码 {start_page} 到 {end_page})...")
     
+    pages = []
     for page_num in range(start_page, end_page + 1):
         page_key = str(page_num)
         if page_key not in font_data:
@@ -205,9 +246,18 @@ def main():
         
         page_data = font_data[page_key]
         output_path = os.path.join(output_dir, f'font{page_num}.png')
-        
-        # 生成图片并收集字体信息
-        generate_font_page(page_num, page_data, font, output_path, font_info_list)
+        pages.append((page_num, page_data, output_path))
+    
+    # 各页面互不依赖，多核时按页并行生成；map 按页码顺序返回，字体信息顺序不变
+    workers = min(os.cpu_count() or 1, len(pages))
+    if workers > 1:
+        with Pool(processes=workers, initializer=init_page_worker, initargs=(font_path,)) as pool:
+            for page_font_info in pool.map(process_page, pages):
+                font_info_list.extend(page_font_info)
+    else:
+        for page_num, page_data, output_path in pages:
+            # 生成图片并收集字体信息
+            generate_font_page(page_num, page_data, font, output_path, font_info_list)
     
     print(f"\n完成! 已生成页码 {start_page} 到 {end_page} 的字体图片")
     
@@ -215,6 +265,7 @@ def main():
     if font_info_list:
         font_info_path = os.path.join(output_dir, 'font_info.json')
         print(f"\n保存字体信息到: {font_info_path}")
+        # orjson 只支持 2 空格缩进，font_info.json 保持原有的 4 空格格式
         with open(font_info_path, 'w', encoding='utf-8') as f:
             json.dump(font_info_list, f, ensure_ascii=False, indent=4)
         print(f"完成! 已生成 {len(font_info_list)} 个字符的字体信息")
@@ -232,8 +283,7 @@ def update_files_json(script_dir, start_page, end_page):
     
     # 读取现有的 files.json
     print(f"\n读取 files.json: {files_json_path}")
-    with open(files_json_path, 'r', encoding='utf-8') as f:
-        files_data = json.load(f)
+    files_data = load_json_file(files_json_path)
     
     # 检查实际生成的 font*.png 文件
     generated_fonts = []
@@ -283,8 +333,7 @@ def update_files_json(script_dir, start_page, end_page):
     # 保存更新后的 files.json
     if updated_count > 0 or len(generated_fonts) > 0:
         print(f"\n更新 files.json...")
-        with open(files_json_path, 'w', encoding='utf-8') as f:
-            json.dump(files_data, f, ensure_ascii=False, indent=2)
+        save_json_file(files_json_path, files_data)
         print(f"完成! 已更新 {len(generated_fonts)} 个字体图片条目到 files.json")
 
 if __name__ == '__main__':
@@ -7,13 +7,61 @@ import json
 import os
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
 # 每个页码有 16x16 = 256 个位置
 CHARS_PER_PAGE = 256
 GRID_SIZE = 16
 
-def create_empty_page():
-    """创建一个空的16x16字符网格"""
-    return [["" for _ in range(GRID_SIZE)] for _ in range(GRID_SIZE)]
+def load_json_file(path):
+    """读取并解析 JSON 文件（优先使用 orjson）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def iter_json_top_level_items(path):
+    """
+    逐个产出 JSON 顶层对象的 (键, 值)，顶层不是对象时不产出任何内容
+    没有 orjson 但安装了 ijson 时流式解析，每次只构建一个顶层值，避免一次性持有整棵对象树
+    """
+    if orjson is None and ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.kvitems(f, '', use_float=True)
+        return
+    data = load_json_file(path)
+    if isinstance(data, dict):
+        yield from data.items()
+
+def save_json_file(path, data):
+    """将数据写为缩进 2 的 JSON 文件（优先使用 orjson，输出与 json.dump(indent=2, ensure_ascii=False) 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(content)
+
+def filter_char_codes(chars_set):
+    """
+    过滤掉控制字符和不可打印字符，返回按 Unicode 码点排序的码点列表
+    控制字符（0x00-0x1F, 0x7F-0x9F）都属于 Cc 类，str.isprintable() 本身就会排除，
+    因此只需这一个判断（常用空白中只有空格是可打印的，与原来的规则一致）
+    """
+    return sorted(ord(char) for char in chars_set if char.isprintable())
+
+def count_printable_chars(chars_set):
+    """统计字符集合中可打印字符的数量（只用于输出统计信息，不构建列表）"""
+    return sum(map(str.isprintable, chars_set))
 
 def collect_chars_from_font_info(font_info_file):
     """从 font_info_small.json 收集所有字符（临时处理）"""
@@ -21,10 +69,9 @@ def collect_chars_from_font_info(font_info_file):
     
     if not font_info_file.exists():
         print(f"警告: 未找到字体信息文件: {font_info_file}")
-        return []
+        return set()
     
-    with open(font_info_file, 'r', encoding='utf-8') as f:
-        font_info_data = json.load(f)
+    font_info_data = load_json_file(font_info_file)
     
     chars_set = set()
     
@@ -36,91 +83,68 @@ def collect_chars_from_font_info(font_info_file):
                 if isinstance(char, str) and char != "":
                     chars_set.add(char)
     
-    # 转换为字符码点列表
-    char_codes = []
-    for char in chars_set:
-        char_code = ord(char)
-        # 排除控制字符
-        if not (0x00 <= char_code <= 0x1F) and char_code != 0x7F and not (0x7F < char_code <= 0x9F):
-            if char.isprintable() or char_code in [0x20, 0x09, 0x0A, 0x0D]:
-                char_codes.append(char_code)
-    
-    # 按 Unicode 码点排序
-    char_codes.sort()
+    print(f"从字体信息文件收集到 {count_printable_chars(chars_set)} 个唯一字符")
     
-    print(f"从字体信息文件收集到 {len(char_codes)} 个唯一字符")
-    
-    return char_codes
+    return chars_set
+
+def collect_strings_from_texts_entry(key, value, texts_buf):
+    """把 texts_translated.json 中一个顶层键值对里的 text/speaker 字符串加入 texts_buf"""
+    # 如果 texts_translated.json 的结构是 {filename: [texts]}
+    if isinstance(value, list):
+        for item in value:
+            if isinstance(item, dict):
+                # 提取 text 字段
+                if 'text' in item:
+                    text = item['text']
+                    if isinstance(text, str):
+                        texts_buf.append(text)
+                # 提取 speaker 字段（如果有）
+                if 'speaker' in item:
+                    speaker = item['speaker']
+                    if isinstance(speaker, str):
+                        texts_buf.append(speaker)
+    # 如果结构是 {speakers: {...}, texts: {...}}
+    if key == 'speakers':
+        for speaker in value.values():
+            if isinstance(speaker, str):
+                texts_buf.append(speaker)
+    if key == 'texts':
+        if isinstance(value, dict):
+            for filename, texts_list in value.items():
+                if isinstance(texts_list, list):
+                    for item in texts_list:
+                        if isinstance(item, dict) and 'text' in item:
+                            text = item['text']
+                            if isinstance(text, str):
+                                texts_buf.append(text)
+        elif isinstance(value, list):
+            for item in value:
+                if isinstance(item, dict):
+                    if 'text' in item:
+                        text = item['text']
+                        if isinstance(text, str):
+                            texts_buf.append(text)
+                    if 'speaker' in item:
+                        speaker = item['speaker']
+                        if isinstance(speaker, str):
+                            texts_buf.append(speaker)
 
 def collect_chars_from_texts(texts_file):
     """从 texts_translated.json 收集所有使用的字符"""
     print(f"读取文件: {texts_file}")
     
-    with open(texts_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    # 先收集所有字符串，最后一次性拼接后构建字符集合
+    texts_buf = []
     
-    chars_set = set()
+    # 遍历所有文本（按顶层键值对逐个处理）
+    for key, value in iter_json_top_level_items(texts_file):
+        collect_strings_from_texts_entry(key, value, texts_buf)
     
-    # 遍历所有文本
-    if isinstance(data, dict):
-        # 如果 texts_translated.json 的结构是 {filename: [texts]}
-        for filename, texts_list in data.items():
-            if isinstance(texts_list, list):
-                for item in texts_list:
-                    if isinstance(item, dict):
-                        # 提取 text 字段
-                        if 'text' in item:
-                            text = item['text']
-                            if isinstance(text, str):
-                                chars_set.update(text)
-                        # 提取 speaker 字段（如果有）
-                        if 'speaker' in item:
-                            speaker = item['speaker']
-                            if isinstance(speaker, str):
-                                chars_set.update(speaker)
-        # 如果结构是 {speakers: {...}, texts: {...}}
-        if 'speakers' in data:
-            for speaker in data['speakers'].values():
-                if isinstance(speaker, str):
-                    chars_set.update(speaker)
-        if 'texts' in data:
-            if isinstance(data['texts'], dict):
-                for filename, texts_list in data['texts'].items():
-                    if isinstance(texts_list, list):
-                        for item in texts_list:
-                            if isinstance(item, dict) and 'text' in item:
-                                text = item['text']
-                                if isinstance(text, str):
-                                    chars_set.update(text)
-            elif isinstance(data['texts'], list):
-                for item in data['texts']:
-                    if isinstance(item, dict):
-                        if 'text' in item:
-                            text = item['text']
-                            if isinstance(text, str):
-                                chars_set.update(text)
-                        if 'speaker' in item:
-                            speaker = item['speaker']
-                            if isinstance(speaker, str):
-                                chars_set.update(speaker)
-    
-    # 过滤掉控制字符和不可打印字符
-    filtered_chars = []
-    for char in chars_set:
-        char_code = ord(char)
-        # 排除控制字符（0x00-0x1F, 0x7F-0x9F）和某些特殊控制字符
-        # 保留所有可打印字符和常用空白字符（包括空格、制表符等）
-        if not (0x00 <= char_code <= 0x1F) and char_code != 0x7F and not (0x7F < char_code <= 0x9F):
-            # 使用 isprintable() 或检查是否为常用空白字符
-            if char.isprintable() or char_code in [0x20, 0x09, 0x0A, 0x0D]:  # 空格、制表符、换行符、回车符
-                filtered_chars.append(char_code)
-    
-    # 按 Unicode 码点排序
-    filtered_chars.sort()
-    
-    print(f"收集到 {len(filtered_chars)} 个唯一字符")
-    
-    return filtered_chars
+    chars_set = set("".join(texts_buf))
+    
+    print(f"收集到 {count_printable_chars(chars_set)} 个唯一字符")
+    
+    return chars_set
 
 def collect_chars_from_speakers(speakers_file):
     """从 speakers_translated.json 收集所有 speaker 字符"""
@@ -128,84 +152,76 @@ def collect_chars_from_speakers(speakers_file):
     
     if not speakers_file.exists():
         print(f"警告: 未找到文件 {speakers_file}")
-        return []
+        return set()
     
-    with open(speakers_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = load_json_file(speakers_file)
     
-    chars_set = set()
+    # 先收集所有字符串，最后一次性拼接后构建字符集合
+    texts_buf = []
     
     # 遍历所有 speaker 翻译
     if isinstance(data, dict):
         for speaker_key, speaker_value in data.items():
             # 收集原始 speaker 名称的字符
             if isinstance(speaker_key, str):
-                chars_set.update(speaker_key)
+                texts_buf.append(speaker_key)
             # 收集翻译后的 speaker 名称的字符
             if isinstance(speaker_value, str):
-                chars_set.update(speaker_value)
+                texts_buf.append(speaker_value)
     
-    # 过滤掉控制字符和不可打印字符
-    filtered_chars = []
-    for char in chars_set:
-        char_code = ord(char)
-        # 排除控制字符（0x00-0x1F, 0x7F-0x9F）和某些特殊控制字符
-        # 保留所有可打印字符和常用空白字符（包括空格、制表符等）
-        if not (0x00 <= char_code <= 0x1F) and char_code != 0x7F and not (0x7F < char_code <= 0x9F):
-            # 使用 isprintable() 或检查是否为常用空白字符
-            if char.isprintable() or char_code in [0x20, 0x09, 0x0A, 0x0D]:  # 空格、制表符、换行符、回车符
-                filtered_chars.append(char_code)
+    chars_set = set("".join(texts_buf))
     
-    # 按 Unicode 码点排序
-    filtered_chars.sort()
+    print(f"从 speakers 收集到 {count_printable_chars(chars_set)} 个唯一字符")
     
-    print(f"从 speakers 收集到 {len(filtered_chars)} 个唯一字符")
+    return chars_set
+
+def collect_all_chars(texts_file, speakers_file, font_info_file):
+    """
+    从 texts、speakers 和 font_info_small.json 收集字符
+    各来源只返回原始字符集合，合并到同一个集合后统一过滤、排序一次，返回码点列表
+    """
+    chars_set = collect_chars_from_texts(texts_file)
     
-    return filtered_chars
+    # 从 speakers_translated.json 收集 speaker 字符
+    speakers_chars = collect_chars_from_speakers(speakers_file)
+    
+    if count_printable_chars(speakers_chars):
+        chars_set |= speakers_chars
+        print(f"\n合并 texts 和 speakers 后总计: {count_printable_chars(chars_set)} 个唯一字符\n")
+    
+    # 临时处理：从 font_info_small.json 收集字符并合并
+    font_info_chars = collect_chars_from_font_info(font_info_file)
+    
+    if count_printable_chars(font_info_chars):
+        chars_set |= font_info_chars
+        print(f"\n合并后总计: {count_printable_chars(chars_set)} 个唯一字符（包含字体信息文件中的字符）\n")
+    
+    # 过滤掉控制字符和不可打印字符，按 Unicode 码点排序
+    return filter_char_codes(chars_set)
 
 def rebuild_font_json(chars_list):
-    """根据字符列表重建 font.json"""
+    """根据字符列表重建 font.json，返回 (font_data, 实际放入的字符总数)"""
     font_data = {}
+    total_chars = 0
     
-    current_index = 0
     max_pages = 32
     
     for page_num in range(max_pages):
-        page = create_empty_page()
-        filled_count = 0
-        
-        for y in range(GRID_SIZE):
-            for x in range(GRID_SIZE):
-                if current_index >= len(chars_list):
-                    break
-                
-                char_code = chars_list[current_index]
-                try:
-                    char = chr(char_code)
-                    # 确保字符是有效的 Unicode 字符
-                    # 所有通过过滤的字符都应该被处理
-                    page[y][x] = char
-                    filled_count += 1
-                except (ValueError, OverflowError) as e:
-                    # 无效的字符码点，跳过但保留位置为空
-                    print(f"警告: 无法处理字符码点 0x{char_code:X} ({char_code})")
-                    page[y][x] = ""
-                
-                current_index += 1
-            
-            if current_index >= len(chars_list):
-                break
-        
-        if filled_count == 0:
+        # 按页切片；码点已在收集阶段过滤过，chr() 不会失败
+        page_codes = chars_list[page_num * CHARS_PER_PAGE:(page_num + 1) * CHARS_PER_PAGE]
+        if not page_codes:
             break
         
-        font_data[str(page_num)] = page
-        print(f"页码 {page_num}: {filled_count} 个字符")
+        # 不足一页的部分用空字符串补齐，再按行切成 16x16 网格
+        chars = [chr(char_code) for char_code in page_codes]
+        chars += [""] * (CHARS_PER_PAGE - len(chars))
+        page = [chars[y * GRID_SIZE:(y + 1) * GRID_SIZE] for y in range(GRID_SIZE)]
         
-        if current_index >= len(chars_list):
-            break
+        font_data[str(page_num)] = page
+        total_chars += len(page_codes)
+        print(f"页码 {page_num}: {len(page_codes)} 个字符")
     
-    return font_data
+    return font_data, total_chars
 
 def main():
     script_dir = Path(__file__).parent
@@ -225,47 +241,22 @@ def main():
     print("\n正在重建 font.json...")
     print("从 texts_translated.json 收集实际使用的字符...\n")
     
-    # 收集字符
-    chars_list = collect_chars_from_texts(texts_file)
-    
-    # 从 speakers_translated.json 收集 speaker 字符
+    # 收集字符（texts、speakers 以及临时的 font_info_small.json）
     speakers_file = project_root / 'texts' / 'speakers_translated.json'
-    speakers_chars = collect_chars_from_speakers(speakers_file)
-    
-    if speakers_chars:
-        # 合并字符列表（去重）
-        all_chars_set = set(chars_list) | set(speakers_chars)
-        chars_list = sorted(list(all_chars_set))
-        print(f"\n合并 texts 和 speakers 后总计: {len(chars_list)} 个唯一字符\n")
-    
-    # 临时处理：从 font_info_small.json 收集字符并合并
     font_info_file = script_dir / 'font_info_small.json'
-    font_info_chars = collect_chars_from_font_info(font_info_file)
-    
-    if font_info_chars:
-        # 合并字符列表（去重）
-        all_chars_set = set(chars_list) | set(font_info_chars)
-        chars_list = sorted(list(all_chars_set))
-        print(f"\n合并后总计: {len(chars_list)} 个唯一字符（包含字体信息文件中的字符）\n")
+    chars_list = collect_all_chars(texts_file, speakers_file, font_info_file)
     
     if len(chars_list) == 0:
         print("错误: 未收集到任何字符")
         return
     
-    # 重建 font.json
-    font_data = rebuild_font_json(chars_list)
-    
-    # 统计字符数量
-    total_chars = 0
-    for page_key, page_data in font_data.items():
-        page_chars = sum(1 for row in page_data for char in row if char != "")
-        total_chars += page_chars
+    # 重建 font.json（字符数量在构建时直接统计，超出页数上限的字符不计入）
+    font_data, total_chars = rebuild_font_json(chars_list)
     
     print(f"\n总计: {total_chars} 个字符（分布在 {len(font_data)} 个页码）")
     
     # 保存JSON文件
-    with open(output_path, 'w', encoding='utf-8') as f:
-        json.dump(font_data, f, ensure_ascii=False, indent=2)
+    save_json_file(output_path, font_data)
     
     print(f"\n已保存到: {output_path}")
 
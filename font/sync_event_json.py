@@ -12,68 +12,68 @@
 import json
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def load_json_file(path):
+    """一次性读取 JSON 文件字节并解析（优先使用 orjson）"""
+    data = Path(path).read_bytes()
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def save_json_file(path, data):
+    """将数据写为缩进 2 的 JSON 文件（优先使用 orjson，输出与 json.dump(indent=2, ensure_ascii=False) 一致）"""
+    if orjson is not None:
+        content = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    else:
+        content = json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+    Path(path).write_bytes(content)
+
 def generate_event_json_from_font(font_json_path, event_json_path):
     """从 font.json 完全生成 event.json"""
     print(f"加载 font.json: {font_json_path}")
     
     # 读取 font.json
-    with open(font_json_path, 'r', encoding='utf-8') as f:
-        font_data = json.load(f)
+    font_data = load_json_file(font_json_path)
     
-    # 生成 event.json 数据
-    event_data = {}
-    total_chars = 0
+    # 收集 (编码值, 字符)；页码按整数升序、网格按行列顺序遍历，
+    # 生成的编码值本身就是严格递增的，不需要再排序
+    entries = []
     
     # 遍历所有页码
     for page_str in sorted(font_data.keys(), key=lambda x: int(x)):
         page_num = int(page_str)
         page_data = font_data[page_str]
         
-        # 遍历16x16网格
-        for y in range(16):
-            if y >= len(page_data):
-                continue
-            row = page_data[y]
-            for x in range(16):
-                if x >= len(row):
-                    continue
-                
-                char = row[x]
-                
+        # 遍历16x16网格（超出 16 行/列的部分忽略，不足的行按实际长度处理）
+        for y, row in enumerate(page_data[:16]):
+            # 计算编码值：page_num * 256 + y * 16 + x
+            # 与 generate_font_images.py 中的公式保持一致
+            row_base = page_num * 256 + y * 16
+            for x, char in enumerate(row[:16]):
                 # 只处理非空字符
-                if char and char != "":
-                    # 计算编码值：page_num * 256 + y * 16 + x
-                    # 与 generate_font_images.py 中的公式保持一致
-                    code = page_num * 256 + y * 16 + x
-                    
-                    # 转换为十六进制字符串（4位，小写）
-                    hex_code_str = f"{code:04x}"
-                    
-                    # 添加到 event.json 数据中
-                    # 如果同一个编码值出现多次（理论上不应该），后面的会覆盖前面的
-                    event_data[hex_code_str] = char
-                    total_chars += 1
+                if char:
+                    entries.append((row_base + x, char))
     
-    print(f"从 font.json 提取了 {total_chars} 个字符")
+    print(f"从 font.json 提取了 {len(entries)} 个字符")
     
-    # 按编码值排序（转换为整数后排序）
-    sorted_event_data = {
-        k: event_data[k] 
-        for k in sorted(event_data.keys(), key=lambda x: int(x, 16))
-    }
+    # 转换为十六进制字符串（4位，小写）作为键，按编码值顺序一次性构建
+    event_data = {f"{code:04x}": char for code, char in entries}
     
     # 保存 event.json
     print(f"\n保存 event.json: {event_json_path}")
-    with open(event_json_path, 'w', encoding='utf-8') as f:
-        json.dump(sorted_event_data, f, ensure_ascii=False, indent=2)
+    save_json_file(event_json_path, event_data)
     
     print(f"\n完成!")
-    print(f"  event.json 包含 {len(sorted_event_data)} 个字符映射")
+    print(f"  event.json 包含 {len(event_data)} 个字符映射")
     
-    # 计算编码范围
-    if sorted_event_data:
-        min_code = min(int(k, 16) for k in sorted_event_data.keys())
-        max_code = max(int(k, 16) for k in sorted_event_data.keys())
+    # 计算编码范围（entries 已按编码值递增）
+    if entries:
+        min_code = entries[0][0]
+        max_code = entries[-1][0]
         print(f"  编码范围: 0x{min_code:04x} - 0x{max_code:04x}")
 
 if __name__ == "__main__":